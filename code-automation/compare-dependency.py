@@ -1,50 +1,91 @@
-import fnmatch
 import os
+import sys
 import json
+from concurrent.futures import ThreadPoolExecutor
 
-def findAllFiles(directory,fileType):
-    matches = []
-    for root, dirnames, filenames in os.walk(directory):
-        for filename in fnmatch.filter(filenames,fileType ):
-            matches.append(os.path.join(root, filename))
-    return matches
-
-def findAllFileWithPattern(directory):
-    files = findAllFiles(directory,'package.json')
-    return files
-
-def findVersionName(path):
-    try:
-        hmap={}
-        if len(path)!=0:
-            file = open(path)
-            data = json.load(file)
-        if type(data) is dict:
-            if "name" in data.keys():
-                if "version" in data.keys():
-                    hmap["name"]=data["name"]
-                    hmap["version"]=data["version"]
-        return hmap
-    except:
-        pass
-    
-def GetFileDetails(src):
-    files1=findAllFileWithPattern(src)
-
-    files1 = [x for x in files1 if x.count("node_modules")==1]
-    
+from file_finder import iter_files
+from manifest_index import ManifestIndex
+from lockfile_versions import find_lockfile, read_lockfile_versions
+from semver import diff_kind
+
+# Read installed versions from yarn.lock / package-lock.json instead of walking node_modules
+USE_LOCKFILE = True
+
+# Also walk nested node_modules and report packages installed at several versions
+REPORT_DUPLICATES = False
+
+# Trees to compare; the first one is the baseline every other tree is compared against
+TREES = {
+    "bolt": '/Users/skhobragade/atlassian/bolt/css-xp/node_modules',
+    "yarn3": '/Users/skhobragade/atlassian/css-xp/node_modules',
+}
+
+# Most significant difference first
+DIFF_GROUPS = {
+    "major": "majorVersions",
+    "minor": "minorVersions",
+    "patch": "patchVersions",
+    "prerelease": "prereleaseVersions",
+    "build": "buildVersions",
+    "invalid": "invalidVersions",
+}
+SEVERITY = list(DIFF_GROUPS)
+
+def findAllFileWithPattern(directory, nested=False):
+    # Only top-level installs unless nested ones are wanted: deeper node_modules are pruned during the walk
+    return iter_files(directory, 'package.json', max_node_modules=None if nested else 1)
+
+def GetFileDetails(src, nested=False):
+    """
+    Returns ({name: (version, path)} for top-level installs, duplicates) where
+    duplicates is {name: {version: [paths]}} for packages found at more than one
+    version anywhere in the tree (only filled when `nested`).
+    """
     hmap1 = {}
+    versions = {}
+
+    # Manifests whose size/mtime are unchanged since the last run come from the index
+    with ManifestIndex() as index:
+        for path, name, version in index.read_all(findAllFileWithPattern(src, nested), root=src):
+            name, version = sys.intern(name), sys.intern(str(version))
+            if not nested or "node_modules" not in os.path.relpath(path, src).split(os.sep):
+                hmap1[name] = (version, path)
+            if nested:
+                versions.setdefault(name, {}).setdefault(version, []).append(path)
+        print(f"📦 {src}: parsed {index.parsed}, reused {index.reused} manifests")
 
-    for x in files1:
-        hmap=findVersionName(x)
-        
-        if hmap is not None and  "name" in hmap.keys():
-            hmap1[hmap["name"]]={
-                "version":hmap["version"],
-                "path":x,
-            }
+    duplicates = {name: found for name, found in versions.items() if len(found) > 1}
+    return hmap1, duplicates
+
+def GetLockfileDetails(src, names):
+    lockfile = find_lockfile(os.path.dirname(src))
+    if lockfile is None:
+        print(f"⚠️ No lockfile next to {src}, walking node_modules instead")
+        return GetFileDetails(src)[0]
+
+    versions = read_lockfile_versions(lockfile)
+    hmap1 = {}
+    missing = []
+
+    for name in names:
+        path = os.path.join(src, name, "package.json")
+        if name in versions:
+            hmap1[sys.intern(name)] = (sys.intern(versions[name]), path)
+        else:
+            missing.append(path)
+
+    # Packages the lockfile can't pin are read straight from their installed manifest
+    with ManifestIndex() as index:
+        for path, name, version in index.read_all(missing):
+            hmap1[sys.intern(name)] = (sys.intern(str(version)), path)
+    print(f"🔒 {lockfile}: {len(names) - len(missing)} from lockfile, {len(missing)} from node_modules")
     return hmap1
 
+def GetTreeDetails(src, names):
+    if USE_LOCKFILE and not REPORT_DUPLICATES:
+        return GetLockfileDetails(src, names), {}
+    return GetFileDetails(src, nested=REPORT_DUPLICATES)
+
 def rootPackageJsonDependencies():
     packageJsonPath = open('/Users/skhobragade/atlassian/css-xp/package.json')
     packageJson = json.load(packageJsonPath)
@@ -54,62 +95,45 @@ def rootPackageJsonDependencies():
         depList.add(x)
     for x in packageJson["devDependencies"].keys():
         depList.add(x)
-    
+
     return depList
-    
 
-def findDependenciesDifference():
-    srcHmap = GetFileDetails('/Users/skhobragade/atlassian/bolt/css-xp/node_modules')
-    desHmap = GetFileDetails('/Users/skhobragade/atlassian/css-xp/node_modules')
-    
+
+def findDependenciesDifference(trees=TREES):
     rootDepList = rootPackageJsonDependencies()
-    hmap={}
-    hmapMajor = {}
-    hmapMinor = {}
-    hmapPatch = {}
-
-    for x in rootDepList:
-    # for x in rootDepList:
-        if x in srcHmap and x in desHmap:
-            if srcHmap[x]["version"]!=desHmap[x]["version"]:
-                
-                srcVersion = srcHmap[x]["version"].split(".")
-                desVersion = desHmap[x]["version"].split(".")
-                
-                if srcVersion[0]!=desVersion[0]:
-                    hmapMajor[x]={
-                        "boltVersion":srcHmap[x]["version"],
-                        "boltPath":srcHmap[x]["path"],
-                        "yarn3Version":desHmap[x]["version"],
-                        "yarnPath":desHmap[x]["path"]
-                    }
-                
-                elif srcVersion[1]!=desVersion[1]:
-                    hmapMinor[x]={
-                        "boltVersion":srcHmap[x]["version"],
-                        "boltPath":srcHmap[x]["path"],
-                        "yarn3Version":desHmap[x]["version"],
-                        "yarnPath":desHmap[x]["path"]
-                    }
-
-                elif srcVersion[2]!=desVersion[2]:
-                    hmapPatch[x]={
-                        "boltVersion":srcHmap[x]["version"],
-                        "boltPath":srcHmap[x]["path"],
-                        "yarn3Version":desHmap[x]["version"],
-                        "yarnPath":desHmap[x]["path"]
-                    }
-                
-    hmap = {
-        "majorVersions":hmapMajor,
-        "minorVersions":hmapMinor,
-        "patchVersions":hmapPatch
-    }
-                
+    labels = list(trees)
+    base = labels[0]
+
+    # Every tree's map is built at the same time
+    with ThreadPoolExecutor(max_workers=len(labels)) as executor:
+        futures = {label: executor.submit(GetTreeDetails, trees[label], rootDepList) for label in labels}
+        details = {label: future.result() for label, future in futures.items()}
+
+    hmap = {group: {} for group in DIFF_GROUPS.values()}
+
+    for x in sorted(rootDepList):
+        if not all(x in details[label][0] for label in labels):
+            continue
+
+        baseVersion = details[base][0][x][0]
+        kinds = [diff_kind(baseVersion, details[label][0][x][0]) for label in labels[1:]]
+        kinds = [kind for kind in kinds if kind]
+        if not kinds:
+            continue
+
+        entry = {}
+        for label in labels:
+            version, path = details[label][0][x]
+            entry[f"{label}Version"] = version
+            entry[f"{label}Path"] = path
+        hmap[DIFF_GROUPS[min(kinds, key=SEVERITY.index)]][x] = entry
+
+    if REPORT_DUPLICATES:
+        hmap["duplicates"] = {label: details[label][1] for label in labels}
+
     json_object = json.dumps(hmap, indent=4)
- 
+
     with open("automation/changedPackage.json", "w") as outfile:
         outfile.write(json_object)
-        
-findDependenciesDifference()
 
+findDependenciesDifference()
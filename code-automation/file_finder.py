@@ -0,0 +1,87 @@
+import os
+import queue
+import fnmatch
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Directories that never hold anything we want to match
+DEFAULT_IGNORE = (".git", ".hg", ".svn", ".yarn", ".cache", ".turbo")
+
+def io_workers(workers=None):
+    """Thread count for I/O-bound pools: `workers` if given, else 4 per CPU, capped at 32."""
+    return workers or min(32, (os.cpu_count() or 1) * 4)
+
+def _is_ignored(name, ignore):
+    for pattern in ignore:
+        if name == pattern or fnmatch.fnmatch(name, pattern):
+            return True
+    return False
+
+def _matcher(pattern):
+    if any(c in pattern for c in "*?["):
+        return lambda name: fnmatch.fnmatch(name, pattern)
+    return lambda name: name == pattern
+
+def iter_files(directory, pattern="package.json", ignore=DEFAULT_IGNORE, max_node_modules=None, workers=None):
+    """
+    Streams every file under `directory` whose name matches `pattern`.
+    Directories are pruned before descending: anything matching `ignore`, and
+    any node_modules that would push the path past `max_node_modules`
+    node_modules segments (counted on the full path, like the old
+    `x.count("node_modules")==1` filter). Subtrees are scanned on a thread pool.
+    """
+    matches = _matcher(pattern)
+    results = queue.Queue()
+    pending = [1]
+    lock = threading.Lock()
+    done = object()
+
+    root_depth = os.path.normpath(directory).split(os.sep).count("node_modules")
+    if max_node_modules is not None and root_depth > max_node_modules:
+        return
+
+    executor = ThreadPoolExecutor(max_workers=io_workers(workers))
+
+    def scan(path, nm_depth):
+        found = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    name = entry.name
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if is_dir:
+                        if _is_ignored(name, ignore):
+                            continue
+                        depth = nm_depth + (name == "node_modules")
+                        if max_node_modules is not None and depth > max_node_modules:
+                            continue
+                        with lock:
+                            pending[0] += 1
+                        executor.submit(scan, entry.path, depth)
+                    elif matches(name):
+                        found.append(entry.path)
+        except OSError:
+            pass
+        finally:
+            if found:
+                results.put(found)
+            with lock:
+                pending[0] -= 1
+                if pending[0] == 0:
+                    results.put(done)
+
+    executor.submit(scan, directory, root_depth)
+    try:
+        while True:
+            batch = results.get()
+            if batch is done:
+                break
+            yield from batch
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def find_files(directory, pattern="package.json", **kwargs):
+    return sorted(iter_files(directory, pattern, **kwargs))
@@ -0,0 +1,189 @@
+import os
+import re
+import json
+import zlib
+import difflib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from file_finder import io_workers
+
+JOURNAL_PATH = os.path.expanduser("~/.cache/python-automation/replace-journal.bin")
+
+_stats_lock = threading.Lock()
+
+class RewriteStats:
+    def __init__(self):
+        self.scanned = 0
+        self.changed = 0
+
+    def __str__(self):
+        return f"{self.changed} of {self.scanned} files changed"
+
+def line_replacer(linetracker, pattern, replacementString):
+    """Builds a transform that applies `pattern` -> `replacementString` on lines matching `linetracker`."""
+    tracker = re.compile(linetracker)
+    prefilter = re.compile(linetracker, re.MULTILINE)
+    regex = re.compile(pattern)
+
+    def transform(content):
+        if not prefilter.search(content):
+            return content
+        lines = content.split("\n")
+        for i in range(len(lines)):
+            if tracker.search(lines[i]):
+                lines[i] = regex.sub(replacementString, lines[i])
+        return "\n".join(lines)
+
+    return transform
+
+def atomic_write(filePath, content):
+    # Temp file in the same directory so os.replace stays a rename on one filesystem
+    directory = os.path.dirname(os.path.abspath(filePath))
+    fd, temp_path = tempfile.mkstemp(prefix=".rewrite-", dir=directory)
+    try:
+        if isinstance(content, bytes):
+            with os.fdopen(fd, "wb") as file:
+                file.write(content)
+        else:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as file:
+                file.write(content)
+        os.chmod(temp_path, os.stat(filePath).st_mode & 0o7777)
+        os.replace(temp_path, filePath)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+class RewriteJournal:
+    """
+    Append-only record of the original bytes of every file a batch modifies.
+    Each record is a JSON header line followed by the zlib-compressed bytes.
+    A record is flushed before its file is replaced, so a crashed run can
+    still be rolled back; a torn last record is simply ignored.
+    The file is only replaced when the first change is recorded, so a run that
+    changes nothing keeps the previous batch's journal.
+    """
+
+    def __init__(self, journal_path=JOURNAL_PATH):
+        os.makedirs(os.path.dirname(journal_path), exist_ok=True)
+        self.journal_path = journal_path
+        self.file = None
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.file is None:
+            return
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+
+    def record(self, filePath, original):
+        data = zlib.compress(original)
+        header = json.dumps({"path": os.path.abspath(filePath), "size": len(data)}).encode("utf-8")
+        with self.lock:
+            if self.file is None:
+                self.file = open(self.journal_path, "wb")
+            self.file.write(header + b"\n" + data)
+            self.file.flush()
+
+def read_journal(journal_path=JOURNAL_PATH):
+    """Yields (path, original_bytes) for every complete record in the journal."""
+    with open(journal_path, "rb") as file:
+        while True:
+            header = file.readline()
+            if not header.endswith(b"\n"):
+                return
+            try:
+                entry = json.loads(header)
+            except ValueError:
+                return
+            data = file.read(entry["size"])
+            if len(data) < entry["size"]:
+                return
+            yield entry["path"], zlib.decompress(data)
+
+def rollback(journal_path=JOURNAL_PATH):
+    """Restores every file recorded in the journal, then removes the journal."""
+    if not os.path.exists(journal_path):
+        print("❌ No replace journal found to roll back.")
+        return 0
+
+    originals = {}
+    for path, original in read_journal(journal_path):
+        # First record wins: that is the state before the batch touched the file
+        originals.setdefault(path, original)
+
+    restored = 0
+    for path, original in originals.items():
+        try:
+            atomic_write(path, original)
+            restored += 1
+        except OSError as e:
+            print(f"❌ Failed to restore '{path}': {e}")
+
+    if restored == len(originals):
+        os.remove(journal_path)
+    print(f"↩️ Restored {restored} of {len(originals)} files")
+    return restored
+
+def rewrite_file(filePath, transform, dry_run=False, stats=None, journal=None):
+    """
+    Applies `transform` to the file's text. Unchanged files are never written,
+    so their mtime is kept. Changed files are written in one go through a temp
+    file and os.replace. With dry_run, the unified diff is returned instead.
+    Returns the diff (possibly empty) when dry_run, else whether the file changed.
+    """
+    with open(filePath, "r", encoding="utf-8", newline="") as file:
+        content = file.read()
+
+    updated = transform(content)
+    changed = updated != content
+
+    if stats is not None:
+        with _stats_lock:
+            stats.scanned += 1
+            stats.changed += changed
+
+    if dry_run:
+        if not changed:
+            return ""
+        return "".join(difflib.unified_diff(
+            content.splitlines(keepends=True),
+            updated.splitlines(keepends=True),
+            fromfile=filePath,
+            tofile=filePath,
+        ))
+
+    if changed:
+        if journal is not None:
+            journal.record(filePath, content.encode("utf-8"))
+        atomic_write(filePath, updated)
+    return changed
+
+def bulk_rewrite(files, transform, journal_path=JOURNAL_PATH, workers=None, stats=None):
+    """
+    Rewrites `files` on a thread pool, journaling the original bytes of every
+    file that changes so the whole batch can be undone with rollback().
+    Returns the list of (path, error) for files that failed.
+    """
+    failures = []
+    with RewriteJournal(journal_path) as journal:
+        with ThreadPoolExecutor(max_workers=io_workers(workers)) as executor:
+            futures = {
+                executor.submit(rewrite_file, filePath, transform, False, stats, journal): filePath
+                for filePath in files
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    failures.append((futures[future], e))
+    return failures
@@ -0,0 +1,92 @@
+import os
+import json
+
+LOCKFILES = ("yarn.lock", "package-lock.json", "npm-shrinkwrap.json")
+
+def find_lockfile(project_dir):
+    for name in LOCKFILES:
+        path = os.path.join(project_dir, name)
+        if os.path.isfile(path):
+            return path
+    return None
+
+def _spec_name(spec):
+    # "@scope/pkg@npm:^1.0.0" -> "@scope/pkg", "pkg@^1.0.0" -> "pkg"
+    spec = spec.strip().strip('"')
+    at = spec.find("@", 1)
+    if at == -1:
+        return spec, ""
+    return spec[:at], spec[at + 1:]
+
+def _read_yarn_lock(path):
+    """
+    Streams a yarn.lock (v1 or berry) and yields (name, version) per entry.
+    Workspace entries are skipped, they are not installed from the registry.
+    """
+    names = None
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            if not line.strip() or line.startswith("#"):
+                continue
+            if not line[0].isspace():
+                key = line.rstrip().rstrip(":")
+                if key == "__metadata":
+                    names = None
+                    continue
+                names = set()
+                for spec in key.split(","):
+                    name, range_ = _spec_name(spec)
+                    if range_.startswith("workspace:"):
+                        names = None
+                        break
+                    names.add(name)
+                continue
+            if names and line.startswith("  version") and not line.startswith("   "):
+                value = line[len("  version"):].lstrip(":").strip().strip('"')
+                for name in names:
+                    yield name, value
+                names = None
+
+def _read_package_lock(path):
+    """Yields (name, version) for every top-level install in a package-lock.json."""
+    with open(path, "rb") as file:
+        data = json.load(file)
+
+    packages = data.get("packages")
+    if packages:
+        # lockfileVersion 2/3: keys are install paths
+        for key, info in packages.items():
+            if not key.startswith("node_modules/") or "/node_modules/" in key:
+                continue
+            if "version" in info and not info.get("link"):
+                yield key[len("node_modules/"):], info["version"]
+        return
+
+    # lockfileVersion 1: top-level "dependencies" are what sits in node_modules
+    for name, info in data.get("dependencies", {}).items():
+        if "version" in info:
+            yield name, info["version"]
+
+def read_lockfile_versions(lockfile):
+    """
+    Returns {name: version} for packages the lockfile pins to exactly one
+    version. Names resolved to several versions are left out, since the
+    lockfile alone does not say which one is hoisted to the top level.
+    """
+    if os.path.basename(lockfile) == "yarn.lock":
+        entries = _read_yarn_lock(lockfile)
+    else:
+        entries = _read_package_lock(lockfile)
+
+    versions = {}
+    ambiguous = set()
+    for name, version in entries:
+        if name in ambiguous:
+            continue
+        seen = versions.get(name)
+        if seen is None:
+            versions[name] = version
+        elif seen != version:
+            ambiguous.add(name)
+            del versions[name]
+    return versions
@@ -0,0 +1,94 @@
+import os
+import json
+import sqlite3
+
+INDEX_PATH = os.path.expanduser("~/.cache/python-automation/manifest-index.sqlite")
+
+def parse_manifest(path):
+    """Returns (name, version) from a package.json, or (None, None) if it has neither."""
+    try:
+        with open(path, "rb") as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return None, None
+    if type(data) is dict and "name" in data and "version" in data:
+        return data["name"], data["version"]
+    return None, None
+
+class ManifestIndex:
+    """
+    Persistent path -> (name, version) index for package.json files.
+    A row is reused while the file's size and mtime are unchanged, so re-runs
+    only re-parse the manifests touched since the last install.
+    """
+
+    def __init__(self, index_path=INDEX_PATH):
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        self.conn = sqlite3.connect(index_path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS manifests ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, name TEXT, version TEXT)"
+        )
+        self.parsed = 0
+        self.reused = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def _cached(self, root):
+        root = os.path.join(root, "")
+        rows = self.conn.execute(
+            "SELECT path, size, mtime, name, version FROM manifests WHERE path >= ? AND path < ?",
+            (root, root + "\uffff"),
+        )
+        return {row[0]: row[1:] for row in rows}
+
+    def read_all(self, paths, root=None):
+        """
+        Yields (path, name, version) for every manifest in `paths` that has both.
+        When `root` is given, rows under it that were not seen are dropped.
+        """
+        cached = self._cached(root) if root else {}
+        updates = []
+        seen = set()
+
+        for path in paths:
+            seen.add(path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+
+            row = cached.get(path)
+            if row is None and not root:
+                row = self.conn.execute(
+                    "SELECT size, mtime, name, version FROM manifests WHERE path = ?", (path,)
+                ).fetchone()
+
+            if row is not None and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+                name, version = row[2], row[3]
+                self.reused += 1
+            else:
+                name, version = parse_manifest(path)
+                updates.append((path, st.st_size, st.st_mtime_ns, name, version))
+                self.parsed += 1
+
+            if name is not None:
+                yield path, name, version
+
+        if updates:
+            self.conn.executemany("INSERT OR REPLACE INTO manifests VALUES (?, ?, ?, ?, ?)", updates)
+        if root:
+            stale = [(p,) for p in cached if p not in seen]
+            if stale:
+                self.conn.executemany("DELETE FROM manifests WHERE path = ?", stale)
+        self.conn.commit()
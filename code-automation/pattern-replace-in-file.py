@@ -1,22 +1,10 @@
-import re
+from file_rewrite import line_replacer, rewrite_file
 
-def track_and_replace_pattern(filePath,linetracker,pattern,replacementString):
-    with open(filePath, 'r+') as file:
-
-        lines = file.readlines()
-        
-        for i in range(len(lines)):
-            match = re.search(linetracker, lines[i])
-
-            if match:
-                newline = re.sub(pattern, replacementString, lines[i])
-                lines[i] = newline
-            
-        file.seek(0)
-        file.truncate()
-        for x in range(len(lines)):
-            file.write(lines[x])
-        file.close
+def track_and_replace_pattern(filePath,linetracker,pattern,replacementString,dry_run=False):
+    result = rewrite_file(filePath, line_replacer(linetracker, pattern, replacementString), dry_run)
+    if dry_run:
+        print(result or f"ℹ️ No changes for {filePath}")
+    return result
 
 pattern1 = r'ts-jest'
 pattern2 = r'\^\d+\.\d+\.\d+'
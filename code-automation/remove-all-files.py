@@ -1,6 +1,141 @@
 import os
-import glob
+import sys
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-files = glob.glob('/Users/skhobragade/atlassian/css-xp/packages/*')
-for f in files:
-    os.remove(f)
\ No newline at end of file
+from file_finder import io_workers
+
+# Report what would be removed without touching anything
+DRY_RUN = "--dry-run" in sys.argv
+
+class _Dir:
+    """A directory waiting for its own files and all its subdirectories to be gone."""
+
+    def __init__(self, path, parent):
+        self.path = path
+        self.parent = parent
+        self.pending = 1
+        self.lock = threading.Lock()
+
+class RemoveStats:
+    def __init__(self):
+        self.files = 0
+        self.dirs = 0
+        self.bytes = 0
+        self.errors = []
+        self.lock = threading.Lock()
+
+    def add(self, files, dirs, size):
+        with self.lock:
+            self.files += files
+            self.dirs += dirs
+            self.bytes += size
+
+    def __str__(self):
+        return f"{self.files} files, {self.dirs} folders, {self.bytes / (1024 * 1024):.2f} MB"
+
+def remove_trees(paths, dry_run=False, workers=None):
+    """
+    Deletes every path in `paths` (files, links or whole trees). Each directory
+    is scanned once with os.scandir, its files are unlinked in one batch on a
+    worker thread, and it is removed as soon as its last subdirectory is gone.
+    """
+    stats = RemoveStats()
+    done = threading.Event()
+    # Starts at 1 so the submitting loop below holds the count open
+    outstanding = [1]
+    outstanding_lock = threading.Lock()
+    executor = ThreadPoolExecutor(max_workers=io_workers(workers))
+
+    def track(delta):
+        with outstanding_lock:
+            outstanding[0] += delta
+            if outstanding[0] == 0:
+                done.set()
+
+    def release(node):
+        # Walk up removing every directory whose last pending piece just finished
+        while node is not None:
+            with node.lock:
+                node.pending -= 1
+                if node.pending:
+                    return
+            try:
+                if not dry_run:
+                    os.rmdir(node.path)
+                stats.add(0, 1, 0)
+            except OSError as e:
+                stats.errors.append((node.path, e))
+            node = node.parent
+
+    def scan(node):
+        try:
+            files, size = [], 0
+            try:
+                with os.scandir(node.path) as it:
+                    for entry in it:
+                        try:
+                            st = entry.stat(follow_symlinks=False)
+                        except OSError as e:
+                            stats.errors.append((entry.path, e))
+                            continue
+                        if stat.S_ISDIR(st.st_mode):
+                            child = _Dir(entry.path, node)
+                            with node.lock:
+                                node.pending += 1
+                            track(1)
+                            executor.submit(scan, child)
+                        else:
+                            files.append(entry.path)
+                            size += st.st_size
+            except OSError as e:
+                stats.errors.append((node.path, e))
+
+            removed = 0
+            for path in files:
+                try:
+                    if not dry_run:
+                        os.unlink(path)
+                    removed += 1
+                except OSError as e:
+                    stats.errors.append((path, e))
+            stats.add(removed, 0, size)
+            release(node)
+        finally:
+            track(-1)
+
+    for path in paths:
+        try:
+            st = os.lstat(path)
+        except OSError as e:
+            stats.errors.append((path, e))
+            continue
+        if stat.S_ISDIR(st.st_mode):
+            track(1)
+            executor.submit(scan, _Dir(path, None))
+        else:
+            try:
+                if not dry_run:
+                    os.unlink(path)
+                stats.add(1, 0, st.st_size)
+            except OSError as e:
+                stats.errors.append((path, e))
+
+    track(-1)
+    done.wait()
+    executor.shutdown()
+    return stats
+
+def remove_all_files(directory, dry_run=False):
+    # Same selection as glob('directory/*'): every entry except hidden ones
+    with os.scandir(directory) as it:
+        paths = [entry.path for entry in it if not entry.name.startswith(".")]
+
+    stats = remove_trees(paths, dry_run=dry_run)
+    for path, error in stats.errors:
+        print(f"❌ Failed to remove '{path}': {error}")
+    print(f"{'🔍 Would free' if dry_run else '🗑️ Freed'}: {stats}")
+
+if __name__ == "__main__":
+    remove_all_files('/Users/skhobragade/atlassian/css-xp/packages', dry_run=DRY_RUN)
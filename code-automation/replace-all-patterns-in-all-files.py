@@ -1,34 +1,13 @@
-import os
-import fnmatch
-
-import re
-
-def track_and_replace_pattern(filePath,linetracker,pattern,replacementString):
-    with open(filePath, 'r+') as file:
-
-        lines = file.readlines()
-        
-        for i in range(len(lines)):
-            # linetracker = r'@atlaskit'
-            # pattern = r'\^\d+\.\d+\.\d+'
-            match = re.search(linetracker, lines[i])
-
-            if match:
-                newline = re.sub(pattern, replacementString, lines[i])
-                lines[i] = newline
-            
-        file.seek(0)
-        file.truncate()
-        for x in range(len(lines)):
-            file.write(lines[x])
-        file.close
+import sys
+
+from file_finder import find_files
+from file_rewrite import RewriteStats, bulk_rewrite, line_replacer, rewrite_file, rollback
+
+# Print a unified diff of what would change instead of writing
+DRY_RUN = False
 
 def find_all_files(directory,fileType):
-    matches = []
-    for root, dirnames, filenames in os.walk(directory):
-        for filename in fnmatch.filter(filenames,fileType ):
-            matches.append(os.path.join(root, filename))
-    return matches
+    return find_files(directory, fileType, max_node_modules=0)
 
 def find_all_files_and_replace_patterns(directory):
     files = find_all_files(directory,'package.json')
@@ -36,7 +15,26 @@ def find_all_files_and_replace_patterns(directory):
     pattern2 = r'\^\d+\.\d+\.\d+'
     replacementString = "^29.1.2"
 
-    for x in files:
-        track_and_replace_pattern(x,pattern1,pattern2,replacementString)
-
-find_all_files_and_replace_patterns('/Users/skhobragade/atlassian/css-xp/packages')
\ No newline at end of file
+    transform = line_replacer(pattern1, pattern2, replacementString)
+    stats = RewriteStats()
+
+    if DRY_RUN:
+        for x in files:
+            result = rewrite_file(x, transform, True, stats)
+            if result:
+                print(result)
+        print(f"🔍 Would change: {stats}")
+        return
+
+    # Originals of every changed file go to the journal, undo with --rollback
+    failures = bulk_rewrite(files, transform, stats=stats)
+    for path, error in failures:
+        print(f"❌ Failed to rewrite '{path}': {error}")
+    print(f"✅ Changed: {stats}")
+    if failures:
+        print("↩️ Run with --rollback to restore every file changed in this batch.")
+
+if "--rollback" in sys.argv:
+    rollback()
+else:
+    find_all_files_and_replace_patterns('/Users/skhobragade/atlassian/css-xp/packages')
\ No newline at end of file
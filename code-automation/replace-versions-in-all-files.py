@@ -1,39 +1,42 @@
-import os
-import fnmatch
 import json
-
 import re
 
-def track_and_replace_pattern(filePath,linetracker,version):
-    with open(filePath, 'r+') as file:
+from workspace_graph import WorkspaceGraph
+from file_rewrite import RewriteStats, rewrite_file
+
+VERSION_PATTERN = re.compile(r'\^\d+\.\d+\.\d+')
+VERSION_GROUPS = ("majorVersions", "minorVersions", "patchVersions")
+
+# Print a unified diff of what would change instead of writing
+DRY_RUN = False
+
+def compile_version_rules(data, groups=VERSION_GROUPS):
+    # Every package name folded into one quoted alternation, so each line is scanned once
+    rules = {}
+    for group in groups:
+        for name, info in data.get(group, {}).items():
+            rules[name] = info["boltVersion"]
+    if not rules:
+        return None, rules
+    names = sorted(rules, key=len, reverse=True)
+    matcher = re.compile(r'"(' + "|".join(re.escape(x) for x in names) + r')"')
+    return matcher, rules
 
-        lines = file.readlines()
-        versionPattern = r'\^\d+\.\d+\.\d+'
-        
+def version_replacer(matcher, rules):
+    def transform(content):
+        if not matcher.search(content):
+            return content
+        lines = content.split("\n")
         for i in range(len(lines)):
-            match = re.search(linetracker, lines[i])
+            match = matcher.search(lines[i])
 
             if match:
-                newline = re.sub(versionPattern, version, lines[i])
-                lines[i] = newline
-            
-        file.seek(0)
-        file.truncate()
-        for x in range(len(lines)):
-            file.write(lines[x])
-        file.close
-
-def find_all_files(directory,fileType):
-    matches = []
-    for root, dirnames, filenames in os.walk(directory):
-        for filename in fnmatch.filter(filenames,fileType ):
-            matches.append(os.path.join(root, filename))
-    return matches
+                lines[i] = VERSION_PATTERN.sub(rules[match.group(1)], lines[i])
+        return "\n".join(lines)
+
+    return transform
 
 def find_all_files_and_replace_versions(directory):
-    files = find_all_files(directory,'package.json')
-    files.append("/Users/skhobragade/atlassian/css-xp/package.json")
-    
     file = open('automation/rootChangedPackage.json')
     data = json.load(file)
 
@@ -48,11 +51,27 @@ def find_all_files_and_replace_versions(directory):
     #     },
     # }
   
-    for x in data["minorVersions"]:
-        pattern = r"\"" + re.escape(x) + r"\""
-        print("changing version for",x,"to ",data["minorVersions"][x]["boltVersion"])
-        for y in files:
-            track_and_replace_pattern(y,pattern,data["minorVersions"][x]["boltVersion"])
+    matcher, rules = compile_version_rules(data)
+    if matcher is None:
+        print("ℹ️ No versions to change.")
+        return
+
+    for x in rules:
+        print("changing version for",x,"to ",rules[x])
+
+    # Only the manifests that mention one of the packages get opened
+    files = WorkspaceGraph.load(directory).files_mentioning(rules)
+    files.append("/Users/skhobragade/atlassian/css-xp/package.json")
+
+    transform = version_replacer(matcher, rules)
+    stats = RewriteStats()
+
+    for y in files:
+        result = rewrite_file(y, transform, DRY_RUN, stats)
+        if DRY_RUN and result:
+            print(result)
+
+    print(f"{'🔍 Would change' if DRY_RUN else '✅ Changed'}: {stats}")
     
 
 find_all_files_and_replace_versions('/Users/skhobragade/atlassian/css-xp/packages')
\ No newline at end of file
@@ -1,17 +1,201 @@
 import os
-import fnmatch
+import re
+import sys
+import json
+import mmap
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from file_finder import iter_files
 
 def find_all_files(directory):
+    return iter_files(directory, 'package.json', max_node_modules=0)
+
+def _escape_length(pattern, i):
+    """Length of the escape starting at pattern[i] (the backslash), so its digits aren't read as literals."""
+    nxt = pattern[i + 1]
+    if nxt in "xuU":
+        return 2 + {"x": 2, "u": 4, "U": 8}[nxt]
+    if nxt == "N" and pattern.startswith("{", i + 2):
+        close = pattern.find("}", i + 2)
+        return (close if close != -1 else len(pattern)) - i + 1
+    if nxt.isdigit():
+        # "\0" and three octal digits are octal escapes, anything else a 1-2 digit group reference
+        octal = pattern[i + 1:i + 4]
+        if nxt == "0":
+            length = 2
+            while length < 4 and i + length < len(pattern) and pattern[i + length] in "01234567":
+                length += 1
+            return length
+        if len(octal) == 3 and all(d in "01234567" for d in octal):
+            return 4
+        return 3 if i + 2 < len(pattern) and pattern[i + 2].isdigit() else 2
+    return 2
+
+def required_literal(pattern):
+    """
+    Longest run of plain characters every match of `pattern` must contain,
+    used to skip files with one mmap.find before running the regex.
+    Returns "" when no such run can be proven (alternation, only classes...).
+    """
+    if "|" in pattern:
+        return ""
+    best, current = "", ""
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\" and i + 1 < len(pattern):
+            nxt = pattern[i + 1]
+            if not nxt.isalnum():
+                i += 2
+                if depth == 0:
+                    current += nxt
+                    continue
+            else:
+                # Classes, anchors, numeric and named escapes all end the run
+                i += _escape_length(pattern, i)
+        elif c in "*?{":
+            # The previous character is optional, so the run ends before it
+            current = current[:-1]
+            if c == "{":
+                close = pattern.find("}", i)
+                i = close + 1 if close != -1 else len(pattern)
+            else:
+                i += 1
+        elif c == "[":
+            # A "]" right after "[" or "[^" is a literal member, not the end of the class
+            j = i + 1
+            if j < len(pattern) and pattern[j] == "^":
+                j += 1
+            if j < len(pattern) and pattern[j] == "]":
+                j += 1
+            while j < len(pattern) and pattern[j] != "]":
+                j += 2 if pattern[j] == "\\" else 1
+            i = j + 1
+        elif c == "(":
+            depth += 1
+            i += 1
+        elif c == ")":
+            depth -= 1
+            i += 1
+        elif c in ".^$+":
+            i += 1
+        else:
+            i += 1
+            if depth == 0:
+                current += c
+                continue
+
+        if len(current) > len(best):
+            best = current
+        current = ""
+    return max(best, current, key=len)
+
+def search_file(path, pattern, flags=0, literal=b""):
+    """
+    Returns one dict per match in `path`, with 1-based line and column.
+    The mmap is only used to skip binary files and files without `literal`;
+    matching runs the str pattern on the decoded text, so ".", "\\w" and
+    "\\u00e9" mean what they do in Python.
+    """
     matches = []
-    for root, dirnames, filenames in os.walk(directory):
-        for filename in fnmatch.filter(filenames, 'package.json'):
-            matches.append(os.path.join(root, filename))
+    try:
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return matches
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if b"\0" in mm[:8192]:
+                    return matches
+                if literal and mm.find(literal) == -1:
+                    return matches
+
+                # Invalid bytes survive as lone surrogates instead of failing the file
+                text = str(mm, "utf-8", "surrogateescape")
+
+            line, last = 1, 0
+            for match in re.compile(pattern, flags).finditer(text):
+                start = match.start()
+                line += text.count("\n", last, start)
+                last = start
+                line_start = text.rfind("\n", 0, start) + 1
+                matches.append({
+                    "path": path,
+                    "line": line,
+                    "column": start - line_start + 1,
+                    "match": match.group(0),
+                })
+    except (OSError, ValueError):
+        pass
     return matches
 
-# Example usage
-directory = '/Users/skhobragade/atlassian/css-xp/packages'
+def _search_chunk(args):
+    paths, pattern, flags, literal = args
+    results = []
+    for path in paths:
+        results.extend(search_file(path, pattern, flags, literal))
+    return results
+
+def _chunks(paths, size):
+    chunk = []
+    for path in paths:
+        chunk.append(path)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def search_contents(directory, pattern, literal=False, ignore_case=False, file_glob="*",
+                    include_node_modules=False, workers=None, chunk_size=64):
+    """Streams match dicts for `pattern` in every file under `directory` matching `file_glob`."""
+    if literal:
+        pattern = re.escape(pattern)
+    flags = re.IGNORECASE if ignore_case else 0
+    # Case folding and verbose whitespace make the pattern text differ from what it matches
+    if re.compile(pattern, flags).flags & (re.IGNORECASE | re.VERBOSE):
+        prefilter = b""
+    else:
+        prefilter = required_literal(pattern).encode("utf-8")
+
+    paths = iter_files(directory, file_glob, max_node_modules=None if include_node_modules else 0)
+    chunks = _chunks(paths, chunk_size)
+    workers = workers or os.cpu_count() or 1
+
+    # Only a few chunks per worker are queued, so results stream while the walk is still running
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(executor.submit(_search_chunk, (chunk, pattern, flags, prefilter)))
+            if len(in_flight) >= workers * 2:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+def main():
+    parser = argparse.ArgumentParser(description="List package.json files, or search file contents.")
+    parser.add_argument("pattern", nargs="?", help="regex to search for; omit to list package.json files")
+    parser.add_argument("-d", "--directory", default='/Users/skhobragade/atlassian/css-xp/packages')
+    parser.add_argument("-F", "--literal", action="store_true", help="treat pattern as a plain string")
+    parser.add_argument("-i", "--ignore-case", action="store_true")
+    parser.add_argument("-g", "--glob", default="package.json", help="file name glob (default: package.json)")
+    parser.add_argument("--include-node-modules", action="store_true")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: one per core)")
+    args = parser.parse_args()
+
+    if args.pattern is None:
+        for x in find_all_files(args.directory):
+            print(x)
+        return
 
-files = find_all_files(directory)
+    try:
+        for match in search_contents(args.directory, args.pattern, args.literal, args.ignore_case,
+                                     args.glob, args.include_node_modules, args.jobs):
+            sys.stdout.write(json.dumps(match) + "\n")
+    except re.error as e:
+        print(f"❌ Invalid pattern '{args.pattern}': {e}")
+        sys.exit(1)
 
-for x in files:
-    print(x)
+if __name__ == "__main__":
+    main()
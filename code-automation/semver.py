@@ -0,0 +1,59 @@
+import re
+from functools import lru_cache
+from collections import namedtuple
+
+SEMVER_PATTERN = re.compile(
+    r'^\s*[v=]?\s*(\d+)\.(\d+)\.(\d+)'
+    r'(?:-([0-9A-Za-z-]+(?:\.[0-9A-Za-z-]+)*))?'
+    r'(?:\+([0-9A-Za-z-]+(?:\.[0-9A-Za-z-]+)*))?\s*$'
+)
+
+Version = namedtuple("Version", ["major", "minor", "patch", "prerelease", "build"])
+
+@lru_cache(maxsize=65536)
+def parse(version):
+    """Parses "1.2.3-beta.1+sha" into a Version, or returns None if it isn't semver."""
+    match = SEMVER_PATTERN.match(version) if isinstance(version, str) else None
+    if not match:
+        return None
+    major, minor, patch, prerelease, build = match.groups()
+    pre = ()
+    if prerelease:
+        # Numeric identifiers sort below alphanumeric ones, and numerically among themselves
+        pre = tuple((0, int(x), "") if x.isdigit() else (1, 0, x) for x in prerelease.split("."))
+    return Version(int(major), int(minor), int(patch), pre, build or "")
+
+def _key(v):
+    # A release sorts above all of its prereleases; build metadata is ignored
+    return (v.major, v.minor, v.patch, not v.prerelease, v.prerelease)
+
+def compare(a, b):
+    """Returns -1, 0 or 1 like a classic cmp; raises ValueError on non-semver input."""
+    va, vb = parse(a), parse(b)
+    if va is None or vb is None:
+        raise ValueError(f"Not a semver version: {a if va is None else b}")
+    ka, kb = _key(va), _key(vb)
+    return (ka > kb) - (ka < kb)
+
+def diff_kind(a, b):
+    """
+    Names the most significant part that differs between two versions:
+    "major", "minor", "patch", "prerelease", "build", or None when equal.
+    Returns "invalid" if either side isn't semver.
+    """
+    if a == b:
+        return None
+    va, vb = parse(a), parse(b)
+    if va is None or vb is None:
+        return "invalid"
+    if va.major != vb.major:
+        return "major"
+    if va.minor != vb.minor:
+        return "minor"
+    if va.patch != vb.patch:
+        return "patch"
+    if va.prerelease != vb.prerelease:
+        return "prerelease"
+    if va.build != vb.build:
+        return "build"
+    return None
@@ -0,0 +1,159 @@
+import os
+import sys
+import json
+import hashlib
+
+from file_finder import iter_files
+
+CACHE_DIR = os.path.expanduser("~/.cache/python-automation")
+DEP_FIELDS = ("dependencies", "devDependencies", "peerDependencies")
+
+def _cache_path(root):
+    digest = hashlib.sha1(os.path.abspath(root).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, f"workspace-graph-{digest}.json")
+
+def _strings(value, found):
+    """Collects every key and string value in a parsed JSON document."""
+    if type(value) is dict:
+        for key, item in value.items():
+            found.add(key)
+            _strings(item, found)
+    elif type(value) is list:
+        for item in value:
+            _strings(item, found)
+    elif type(value) is str:
+        found.add(value)
+    return found
+
+def _parse(path):
+    try:
+        with open(path, "rb") as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if type(data) is not dict:
+        return None
+    return {
+        "name": data.get("name"),
+        "version": data.get("version"),
+        "deps": {field: data[field] for field in DEP_FIELDS if type(data.get(field)) is dict},
+        # Any quoted string, so rewrites also reach optionalDependencies, resolutions, overrides...
+        "mentions": sorted(_strings(data, set())),
+    }
+
+class WorkspaceGraph:
+    """
+    Dependency graph of every workspace package.json under `root`, with an
+    inverted "who depends on X at which range" index. Parsed manifests are
+    persisted and only re-parsed when their size or mtime changes.
+    """
+
+    def __init__(self, root, manifests):
+        self.root = root
+        self.manifests = manifests
+        self.packages = {}
+        self.dependents_index = {}
+        self.mentions_index = {}
+
+        for path, info in manifests.items():
+            if info["name"]:
+                self.packages[info["name"]] = path
+            for string in info["mentions"]:
+                self.mentions_index.setdefault(string, []).append(path)
+            for field, deps in info["deps"].items():
+                for dep, range_ in deps.items():
+                    self.dependents_index.setdefault(dep, []).append((info["name"], range_, field, path))
+
+    @classmethod
+    def load(cls, root, cache_path=None):
+        cache_path = cache_path or _cache_path(root)
+        try:
+            with open(cache_path, "r") as file:
+                cached = json.load(file)
+        except (OSError, ValueError):
+            cached = {}
+
+        manifests = {}
+        dirty = False
+        for path in iter_files(root, "package.json", max_node_modules=0):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entry = cached.get(path)
+            if (entry is not None and entry["size"] == st.st_size and entry["mtime"] == st.st_mtime_ns
+                    and "mentions" in entry):
+                manifests[path] = entry
+                continue
+            info = _parse(path)
+            if info is None:
+                continue
+            info["size"], info["mtime"] = st.st_size, st.st_mtime_ns
+            manifests[path] = info
+            dirty = True
+
+        if dirty or len(manifests) != len(cached):
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            temp_path = cache_path + ".tmp"
+            with open(temp_path, "w") as file:
+                json.dump(manifests, file)
+            os.replace(temp_path, cache_path)
+
+        return cls(root, manifests)
+
+    def dependents(self, name):
+        """Returns [(package, range, field, path)] for every workspace package depending on `name`."""
+        return self.dependents_index.get(name, [])
+
+    def files_mentioning(self, names):
+        """
+        Paths of the package.json files containing any of `names` as a quoted
+        string anywhere: dependency fields, resolutions, overrides and so on.
+        """
+        paths = set()
+        for name in names:
+            paths.update(self.mentions_index.get(name, ()))
+        return sorted(paths)
+
+    def topological_order(self):
+        """Workspace package names ordered so every package comes after its workspace dependencies."""
+        internal = {}
+        for name, path in self.packages.items():
+            deps = set()
+            for field_deps in self.manifests[path]["deps"].values():
+                deps.update(dep for dep in field_deps if dep in self.packages and dep != name)
+            internal[name] = deps
+
+        remaining = {name: len(deps) for name, deps in internal.items()}
+        users = {}
+        for name, deps in internal.items():
+            for dep in deps:
+                users.setdefault(dep, []).append(name)
+
+        ready = sorted(name for name, count in remaining.items() if count == 0)
+        order = []
+        while ready:
+            name = ready.pop()
+            order.append(name)
+            for user in users.get(name, ()):
+                remaining[user] -= 1
+                if remaining[user] == 0:
+                    ready.append(user)
+
+        if len(order) != len(internal):
+            cycle = sorted(name for name, count in remaining.items() if count > 0)
+            raise ValueError(f"Dependency cycle between workspace packages: {', '.join(cycle)}")
+        return order
+
+if __name__ == "__main__":
+    directory = '/Users/skhobragade/atlassian/css-xp/packages'
+    graph = WorkspaceGraph.load(directory)
+
+    if len(sys.argv) > 2 and sys.argv[1] == "who":
+        for package, range_, field, path in graph.dependents(sys.argv[2]):
+            print(f"{package} {range_} ({field}) {path}")
+    elif len(sys.argv) > 1 and sys.argv[1] == "order":
+        for name in graph.topological_order():
+            print(name)
+    else:
+        print("Usage: workspace_graph.py who <package> | order")
@@ -1,59 +1,34 @@
 import os
 
-LOG_FILE = ".rename_log.txt"
-
-def add_prefix_to_items(path, prefix):
-    items = sorted(os.listdir(path), reverse=True)
-    log_lines = []
+from rename_planner import apply_plan, build_plan, prefix_namer
+from rename_journal import RenameJournal, list_generations, undo_generations
 
-    for item in items:
-        old_path = os.path.join(path, item)
+LOG_FILE = ".rename_log.txt"
 
-        # Skip if already has the prefix
-        if item.startswith(f"{prefix}-"):
-            continue
+def add_prefix_to_items(path, prefix, recursive=False):
+    plan = build_plan(path, prefix_namer(prefix, LOG_FILE), recursive=recursive)
+    if plan.conflicts:
+        for conflict in plan.conflicts:
+            print(f"❌ {conflict}")
+        print("ℹ️ Nothing was renamed, fix the conflicts above first.")
+        return
 
-        new_name = f"{prefix}-{item}"
-        new_path = os.path.join(path, new_name)
+    # Each wave is journaled before it runs, so even a crashed run can be undone
+    with RenameJournal(path, LOG_FILE) as journal:
+        failures = apply_plan(plan, before_wave=journal.record_intents)
 
-        try:
-            os.rename(old_path, new_path)
-            log_lines.append(f"{new_name}|{item}")  # Log: new_name|old_name
-            print(f"✅ Renamed: '{item}' → '{new_name}'")
-        except Exception as e:
-            print(f"❌ Failed to rename '{item}': {e}")
+    for old_path, e in failures:
+        print(f"❌ Failed to rename '{old_path}': {e}")
 
-    # Write the log file if any renames happened
-    if log_lines:
-        with open(os.path.join(path, LOG_FILE), "w") as f:
-            f.write("\n".join(log_lines))
-        print(f"\n📝 Rename log saved to '{LOG_FILE}' in the folder.")
+    renamed = len(plan) - len(failures)
+    if renamed:
+        print(f"✅ Renamed {renamed} of {len(plan)} items")
+        print(f"\n📝 Rename log saved as generation {journal.generation} ('{os.path.basename(journal.journal_path)}')")
     else:
         print("ℹ️ No files or folders were renamed.")
 
-def undo_renames(path):
-    log_path = os.path.join(path, LOG_FILE)
-
-    if not os.path.exists(log_path):
-        print("❌ No rename log found to undo.")
-        return
-
-    with open(log_path, "r") as f:
-        lines = f.readlines()
-
-    for line in lines:
-        new_name, old_name = line.strip().split("|")
-        new_path = os.path.join(path, new_name)
-        old_path = os.path.join(path, old_name)
-
-        try:
-            os.rename(new_path, old_path)
-            print(f"↩️ Undone: '{new_name}' → '{old_name}'")
-        except Exception as e:
-            print(f"❌ Failed to undo '{new_name}': {e}")
-
-    os.remove(log_path)
-    print(f"\n🗑️ Removed log file '{LOG_FILE}'")
+def undo_renames(path, to_generation=None):
+    undo_generations(path, LOG_FILE, to_generation)
 
 def main():
     path = input("Enter the directory path: ").strip()
@@ -64,10 +39,17 @@ def main():
     action = input("Type 'undo' to revert last rename, or press Enter to add prefix: ").strip().lower()
 
     if action == "undo":
-        undo_renames(path)
+        generations = list_generations(path, LOG_FILE)
+        if len(generations) > 1:
+            print("📜 Generations: " + ", ".join(str(generation) for generation, _ in generations))
+            choice = input("Undo back to which generation? (Enter = latest only): ").strip()
+            undo_renames(path, int(choice) if choice.isdigit() else None)
+        else:
+            undo_renames(path)
     else:
         prefix = input("Enter the prefix to add (e.g., 'demo'): ").strip()
-        add_prefix_to_items(path, prefix)
+        recursive = input("🔁 Include subfolders? (y/n): ").strip().lower() == 'y'
+        add_prefix_to_items(path, prefix, recursive=recursive)
 
 if __name__ == "__main__":
     main()
@@ -1,11 +1,13 @@
 import os
-import shutil
+
+from organizer import RULES, apply_plan, build_plan, make_rule
 
 def organize_files_into_folders():
     """
-    Prompts the user for a directory path.
-    For each file in that path, creates a folder with the same name (without extension)
-    and moves the file into that folder.
+    Prompts the user for a directory path and a rule.
+    Each file in that path is moved into a folder picked by the rule:
+    its own name without extension (the default), its extension, its
+    modification date, its EXIF date, or a regex capture of its name.
     """
     path = input("Enter the directory path: ").strip()
 
@@ -13,20 +15,31 @@ def organize_files_into_folders():
         print(f"❌ Error: '{path}' is not a valid directory.")
         return
 
-    for item in os.listdir(path):
-        item_path = os.path.join(path, item)
+    rule = input(f"📐 Rule ({', '.join(RULES)}) [default: stem]: ").strip().lower() or "stem"
+    if rule not in RULES:
+        print(f"❌ Unknown rule '{rule}'.")
+        return
+
+    date_format, pattern = "%Y/%m", None
+    if rule in ("date", "exif"):
+        date_format = input("📅 Folder date format [default: %Y/%m]: ").strip() or date_format
+    elif rule == "regex":
+        pattern = input("🔤 Regex, capture groups become folders (e.g. '^(\\w+)_'): ").strip()
 
-        # Only process files (skip folders)
-        if os.path.isfile(item_path):
-            file_name, _ = os.path.splitext(item)
-            folder_path = os.path.join(path, file_name)
+    destination = input("📁 Destination folder [default: same folder]: ").strip() or None
+    dry_run = input("🔍 Dry run, only show the plan? (y/n): ").strip().lower() == 'y'
 
-            # Create folder if it doesn't exist
-            os.makedirs(folder_path, exist_ok=True)
+    plan = build_plan(path, make_rule(rule, date_format, pattern), destination)
+    if dry_run:
+        plan.print()
+        return
 
-            # Move the file into its folder
-            shutil.move(item_path, os.path.join(folder_path, item))
-            print(f"✅ Moved '{item}' → '{folder_path}/'")
+    for conflict in plan.conflicts:
+        print(f"⚠️ {conflict}")
+    moved, failures = apply_plan(plan)
+    for src, e in failures:
+        print(f"❌ Failed to move '{src}': {e}")
+    print(f"✅ Moved {moved} of {len(plan.moves)} files")
 
 if __name__ == "__main__":
     organize_files_into_folders()
@@ -0,0 +1,245 @@
+import os
+import sys
+import json
+import zlib
+import struct
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from rename_planner import io_workers
+
+MAGIC = b"DINV1\n"
+
+class Snapshot:
+    """Columnar inventory of a tree: one list of relative paths plus parallel size/mtime/inode arrays."""
+
+    def __init__(self, root, paths, sizes, mtimes, inodes):
+        self.root = root
+        self.paths = paths
+        self.sizes = sizes
+        self.mtimes = mtimes
+        self.inodes = inodes
+
+    def save(self, snapshot_path):
+        blobs = [
+            zlib.compress("\0".join(self.paths).encode("utf-8", "surrogateescape"), 1),
+            zlib.compress(self.sizes.tobytes(), 1),
+            zlib.compress(self.mtimes.tobytes(), 1),
+            zlib.compress(self.inodes.tobytes(), 1),
+        ]
+        header = json.dumps({"root": self.root, "count": len(self.paths), "lengths": [len(b) for b in blobs]}).encode("utf-8")
+        with open(snapshot_path, "wb") as file:
+            file.write(MAGIC + struct.pack("<I", len(header)) + header)
+            for blob in blobs:
+                file.write(blob)
+
+    @classmethod
+    def load(cls, snapshot_path):
+        with open(snapshot_path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"'{snapshot_path}' is not an inventory snapshot")
+            (length,) = struct.unpack("<I", file.read(4))
+            header = json.loads(file.read(length))
+            blobs = [zlib.decompress(file.read(n)) for n in header["lengths"]]
+
+        paths = blobs[0].decode("utf-8", "surrogateescape").split("\0") if header["count"] else []
+        columns = []
+        for blob, typecode in zip(blobs[1:], "qqQ"):
+            column = array(typecode)
+            column.frombytes(blob)
+            columns.append(column)
+        return cls(header["root"], paths, *columns)
+
+def scan(root, workers=None):
+    """
+    Scans `root` with os.scandir on a thread pool and returns a Snapshot of
+    every non-directory entry, sorted by path (diff relies on that order).
+    """
+    rows = []
+    lock = threading.Lock()
+    pending = [1]
+    done = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=io_workers(workers))
+
+    def visit(directory):
+        found = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        with lock:
+                            pending[0] += 1
+                        executor.submit(visit, entry.path)
+                    else:
+                        found.append((os.path.relpath(entry.path, root), st.st_size, st.st_mtime_ns, st.st_ino))
+        except OSError as e:
+            print(f"⚠️ Skipping '{directory}': {e}")
+        finally:
+            with lock:
+                rows.extend(found)
+                pending[0] -= 1
+                if pending[0] == 0:
+                    done.set()
+
+    executor.submit(visit, root)
+    done.wait()
+    executor.shutdown()
+
+    rows.sort()
+    return Snapshot(
+        os.path.abspath(root),
+        [row[0] for row in rows],
+        array("q", (row[1] for row in rows)),
+        array("q", (row[2] for row in rows)),
+        array("Q", (row[3] for row in rows)),
+    )
+
+def _top(path):
+    return path.split(os.sep, 1)[0] if os.sep in path else "."
+
+def subtree_sizes(snapshot):
+    sizes = {}
+    for path, size in zip(snapshot.paths, snapshot.sizes):
+        key = _top(path)
+        sizes[key] = sizes.get(key, 0) + size
+    return sizes
+
+BLOCK = 1024
+
+def _merge(before, after):
+    """
+    Walks both path-sorted snapshots in step. Runs of BLOCK entries whose
+    paths, sizes and mtimes are identical are skipped with C-level slice
+    compares, so only the regions around changes are visited one by one.
+    Returns (removed indices, added indices, modified (path, delta)).
+    """
+    a_paths, b_paths = before.paths, after.paths
+    na, nb = len(a_paths), len(b_paths)
+    removed, added, modified = [], [], []
+    i = j = 0
+    cooldown = 0
+
+    while i < na and j < nb:
+        if not cooldown and i + BLOCK <= na and j + BLOCK <= nb:
+            if (a_paths[i:i + BLOCK] == b_paths[j:j + BLOCK]
+                    and before.sizes[i:i + BLOCK] == after.sizes[j:j + BLOCK]
+                    and before.mtimes[i:i + BLOCK] == after.mtimes[j:j + BLOCK]):
+                i += BLOCK
+                j += BLOCK
+                continue
+            # Something in this block changed (or the paths are out of step):
+            # walk the next BLOCK entries one by one before slicing again
+            cooldown = BLOCK
+
+        if cooldown:
+            cooldown -= 1
+        p, q = a_paths[i], b_paths[j]
+        if p == q:
+            if before.sizes[i] != after.sizes[j] or before.mtimes[i] != after.mtimes[j]:
+                modified.append((q, after.sizes[j] - before.sizes[i]))
+            i += 1
+            j += 1
+        elif p < q:
+            removed.append(i)
+            i += 1
+        else:
+            added.append(j)
+            j += 1
+
+    removed.extend(range(i, na))
+    added.extend(range(j, nb))
+    return removed, added, modified
+
+def diff(before, after):
+    """
+    Compares two snapshots: added, removed, renamed (same inode, size and
+    mtime at a new path), modified (size or mtime changed) and per top-level
+    folder size deltas, all computed from the changed entries only.
+    """
+    removed_rows, added_rows, modified = _merge(before, after)
+    old_rows = {before.paths[i]: i for i in removed_rows}
+    new_rows = {after.paths[j]: j for j in added_rows}
+
+    # A removed path whose inode, size and mtime show up again at an added path was renamed
+    added_by_inode = {after.inodes[i]: p for p, i in new_rows.items()}
+    renamed = []
+    for path, i in old_rows.items():
+        target = added_by_inode.get(before.inodes[i])
+        if target is not None:
+            j = new_rows[target]
+            if before.sizes[i] == after.sizes[j] and before.mtimes[i] == after.mtimes[j]:
+                del added_by_inode[before.inodes[i]]
+                renamed.append((path, target))
+    renamed_from = {old for old, _ in renamed}
+    renamed_to = {new for _, new in renamed}
+    removed = [p for p in old_rows if p not in renamed_from]
+    added = [p for p in new_rows if p not in renamed_to]
+
+    subtree = {}
+    def bump(path, delta):
+        key = _top(path)
+        subtree[key] = subtree.get(key, 0) + delta
+    for path in removed:
+        bump(path, -before.sizes[old_rows[path]])
+    for path in added:
+        bump(path, after.sizes[new_rows[path]])
+    for old, new in renamed:
+        size = before.sizes[old_rows[old]]
+        bump(old, -size)
+        bump(new, size)
+    for path, delta in modified:
+        bump(path, delta)
+
+    return {
+        "added": added,
+        "removed": removed,
+        "renamed": renamed,
+        "modified": modified,
+        "size_delta": sum(after.sizes) - sum(before.sizes),
+        "subtree_deltas": {k: v for k, v in sorted(subtree.items()) if v},
+    }
+
+def main():
+    args = sys.argv[1:]
+    action = args[0] if args else input("Type 'scan' to take a snapshot or 'diff' to compare two: ").strip().lower()
+
+    if action == "scan":
+        path = args[1] if len(args) > 1 else input("Enter the directory path: ").strip()
+        if not os.path.isdir(path):
+            print(f"❌ Error: '{path}' is not a valid directory.")
+            return
+        output = args[2] if len(args) > 2 else input("Snapshot file to write: ").strip()
+        snapshot = scan(path)
+        snapshot.save(output)
+        for folder, size in sorted(subtree_sizes(snapshot).items(), key=lambda item: -item[1]):
+            print(f"📁 {folder}: {size / (1024 * 1024):.2f} MB")
+        print(f"📸 {len(snapshot.paths)} entries, {sum(snapshot.sizes) / (1024 * 1024):.2f} MB → {output}")
+
+    elif action == "diff":
+        first = args[1] if len(args) > 1 else input("Older snapshot: ").strip()
+        second = args[2] if len(args) > 2 else input("Newer snapshot: ").strip()
+        result = diff(Snapshot.load(first), Snapshot.load(second))
+        for old, new in result["renamed"]:
+            print(f"🔀 {old} → {new}")
+        for path in result["added"]:
+            print(f"➕ {path}")
+        for path in result["removed"]:
+            print(f"➖ {path}")
+        for path, delta in result["modified"]:
+            print(f"✏️ {path} ({delta:+d} bytes)")
+        for folder, delta in result["subtree_deltas"].items():
+            print(f"📁 {folder}: {delta / 1024:+.1f} KB")
+        print(f"\n🧾 {len(result['added'])} added, {len(result['removed'])} removed, "
+              f"{len(result['renamed'])} renamed, {len(result['modified'])} modified, "
+              f"{result['size_delta'] / (1024 * 1024):+.2f} MB")
+
+    else:
+        print(f"❌ Unknown action '{action}'.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import os
+import json
+import mmap
+import sqlite3
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from rename_planner import io_workers
+
+CACHE_PATH = os.path.expanduser("~/.cache/python-automation/hash-cache.sqlite")
+EDGE_SIZE = 4 * 1024  # bytes hashed from each end in the quick stage
+CHUNK_SIZE = 8 * 1024 * 1024
+REPORT_FILE = "duplicates_report.json"
+
+def scan_files(path):
+    """Returns {(dev, inode): (path, size, mtime_ns)} for every regular file, one path per inode."""
+    files = {}
+    pending = [path]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            st = entry.stat(follow_symlinks=False)
+                            if st.st_size:
+                                files.setdefault((st.st_dev, st.st_ino), (entry.path, st.st_size, st.st_mtime_ns))
+                    except OSError:
+                        continue
+        except OSError as e:
+            print(f"⚠️ Skipping '{directory}': {e}")
+    return files
+
+def edge_hash(path, size):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        digest.update(file.read(EDGE_SIZE))
+        if size > EDGE_SIZE:
+            file.seek(max(EDGE_SIZE, size - EDGE_SIZE))
+            digest.update(file.read(EDGE_SIZE))
+    return digest.hexdigest()
+
+def full_hash(path, size):
+    digest = hashlib.blake2b()
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for offset in range(0, size, CHUNK_SIZE):
+                digest.update(mm[offset:offset + CHUNK_SIZE])
+    return digest.hexdigest()
+
+class HashCache:
+    """Edge and full hashes keyed by (dev, inode, size, mtime), so unchanged files are never re-read."""
+
+    def __init__(self, cache_path=CACHE_PATH):
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        self.conn = sqlite3.connect(cache_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            "dev INTEGER, inode INTEGER, size INTEGER, mtime INTEGER, edge TEXT, full TEXT, "
+            "PRIMARY KEY (dev, inode))"
+        )
+        self.rows = {
+            (dev, inode): (size, mtime, edge, full)
+            for dev, inode, size, mtime, edge, full in self.conn.execute("SELECT * FROM hashes")
+        }
+        self.updates = {}
+
+    def get(self, key, size, mtime, kind):
+        row = self.updates.get(key) or self.rows.get(key)
+        if row is None or row[0] != size or row[1] != mtime:
+            return None
+        return row[2] if kind == "edge" else row[3]
+
+    def put(self, key, size, mtime, kind, value):
+        row = self.updates.get(key) or self.rows.get(key)
+        if row is None or row[0] != size or row[1] != mtime:
+            row = (size, mtime, None, None)
+        row = (size, mtime, value, row[3]) if kind == "edge" else (size, mtime, row[2], value)
+        self.updates[key] = row
+
+    def close(self):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?)",
+            [(key[0], key[1], *row) for key, row in self.updates.items()],
+        )
+        self.conn.commit()
+        self.conn.close()
+
+def _group_by(keys, files, cache, kind, hasher, executor):
+    """Hashes `keys` (cached where possible) and returns only groups with more than one member."""
+    groups = {}
+    todo = []
+    for key in keys:
+        path, size, mtime = files[key]
+        value = cache.get(key, size, mtime, kind)
+        if value is None:
+            todo.append(key)
+        else:
+            groups.setdefault(value, []).append(key)
+
+    def work(key):
+        path, size, mtime = files[key]
+        try:
+            return key, hasher(path, size)
+        except (OSError, ValueError):
+            return key, None
+
+    for key, value in executor.map(work, todo):
+        if value is None:
+            continue
+        path, size, mtime = files[key]
+        cache.put(key, size, mtime, kind, value)
+        groups.setdefault(value, []).append(key)
+    return [group for group in groups.values() if len(group) > 1]
+
+def find_duplicates(path, workers=None):
+    """Returns a list of duplicate groups, each a list of paths with the oldest first."""
+    files = scan_files(path)
+
+    by_size = {}
+    for key, (_, size, _) in files.items():
+        by_size.setdefault(size, []).append(key)
+
+    cache = HashCache()
+    duplicates = []
+    try:
+        with ThreadPoolExecutor(max_workers=io_workers(workers)) as executor:
+            for keys in by_size.values():
+                if len(keys) < 2:
+                    continue
+                for edge_group in _group_by(keys, files, cache, "edge", edge_hash, executor):
+                    if files[edge_group[0]][1] <= 2 * EDGE_SIZE:
+                        # The edges already covered the whole file
+                        full_groups = [edge_group]
+                    else:
+                        full_groups = _group_by(edge_group, files, cache, "full", full_hash, executor)
+                    for group in full_groups:
+                        ordered = sorted(group, key=lambda key: (files[key][2], len(files[key][0])))
+                        duplicates.append([files[key][0] for key in ordered])
+    finally:
+        cache.close()
+
+    return sorted(duplicates, key=lambda group: group[0])
+
+def apply_action(duplicates, action):
+    """Keeps the first path of each group and deletes or hardlinks the rest."""
+    freed = 0
+    for group in duplicates:
+        keeper = group[0]
+        for duplicate in group[1:]:
+            try:
+                size = os.path.getsize(duplicate)
+                if action == "delete":
+                    os.remove(duplicate)
+                else:
+                    temp_path = duplicate + ".dup-link"
+                    os.link(keeper, temp_path)
+                    os.replace(temp_path, duplicate)
+                freed += size
+            except OSError as e:
+                print(f"❌ Failed to {action} '{duplicate}': {e}")
+    return freed
+
+def main():
+    path = input("Enter the directory path: ").strip()
+    if not os.path.isdir(path):
+        print(f"❌ Error: '{path}' is not a valid directory.")
+        return
+
+    duplicates = find_duplicates(path)
+    wasted = sum(os.path.getsize(group[0]) * (len(group) - 1) for group in duplicates)
+
+    report_path = os.path.join(path, REPORT_FILE)
+    with open(report_path, "w") as f:
+        json.dump({"groups": duplicates, "wasted_bytes": wasted}, f, indent=4)
+    print(f"📝 {len(duplicates)} duplicate groups, {wasted / (1024 * 1024):.2f} MB wasted. Report: {report_path}")
+
+    if not duplicates:
+        return
+    action = input("Type 'hardlink' or 'delete' to act on duplicates (oldest copy is kept), or press Enter to stop: ").strip().lower()
+    if action in ("hardlink", "delete"):
+        freed = apply_action(duplicates, action)
+        print(f"✅ Freed {freed / (1024 * 1024):.2f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import os
+import re
+import errno
+import shutil
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from rename_planner import io_workers
+
+# EXIF dates need Pillow; without it the "exif" rule falls back to modification dates
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+EXIF_IFD = 0x8769
+EXIF_DATE_TAGS = (36867, 36868)  # DateTimeOriginal, DateTimeDigitized
+BASE_DATE_TAG = 306  # DateTime
+
+RULES = ("stem", "extension", "date", "exif", "regex")
+
+def _exif_date(path):
+    if Image is None:
+        return None
+    try:
+        with Image.open(path) as img:
+            exif = img.getexif()
+            value = None
+            for tag in EXIF_DATE_TAGS:
+                value = value or exif.get_ifd(EXIF_IFD).get(tag)
+            value = value or exif.get(BASE_DATE_TAG)
+    except Exception:
+        return None
+    try:
+        return datetime.strptime(str(value).strip("\0 "), "%Y:%m:%d %H:%M:%S")
+    except ValueError:
+        return None
+
+def make_rule(rule, date_format="%Y/%m", pattern=None):
+    """
+    Returns folder_for(name, path, stat) giving the folder a file belongs in,
+    relative to the destination, or None to leave the file where it is.
+    """
+    if rule == "stem":
+        return lambda name, path, st: os.path.splitext(name)[0]
+
+    if rule == "extension":
+        return lambda name, path, st: os.path.splitext(name)[1][1:].lower() or "no-extension"
+
+    if rule == "date":
+        return lambda name, path, st: datetime.fromtimestamp(st.st_mtime).strftime(date_format)
+
+    if rule == "exif":
+        def folder_for(name, path, st):
+            taken = _exif_date(path) or datetime.fromtimestamp(st.st_mtime)
+            return taken.strftime(date_format)
+        return folder_for
+
+    if rule == "regex":
+        regex = re.compile(pattern)
+
+        def folder_for(name, path, st):
+            match = regex.search(name)
+            if not match:
+                return None
+            groups = [g for g in match.groups() if g] or [match.group(0)]
+            return os.path.join(*groups)
+        return folder_for
+
+    raise ValueError(f"Unknown rule '{rule}', expected one of: {', '.join(RULES)}")
+
+class OrganizePlan:
+    def __init__(self):
+        self.moves = []
+        self.conflicts = []
+
+    def print(self):
+        for src, dst in self.moves:
+            print(f"📄 {src} → {dst}")
+        for conflict in self.conflicts:
+            print(f"⚠️ {conflict}")
+        print(f"\n🧭 {len(self.moves)} files to move, {len(self.conflicts)} skipped")
+
+def build_plan(path, folder_for, destination=None, names=None, workers=None):
+    """
+    Plans where every file directly in `path` (or only `names`, if given)
+    goes. Folders are computed on a thread pool since EXIF rules read files.
+    Targets that already exist or are claimed twice are reported, not planned.
+    """
+    destination = destination or path
+    if names is None:
+        with os.scandir(path) as it:
+            names = [entry.name for entry in it if entry.is_file(follow_symlinks=False)]
+
+    def locate(name):
+        src = os.path.join(path, name)
+        try:
+            st = os.stat(src, follow_symlinks=False)
+            folder = folder_for(name, src, st)
+        except OSError:
+            return src, None
+        return src, folder and os.path.join(destination, folder, name)
+
+    plan = OrganizePlan()
+    claimed = set()
+    with ThreadPoolExecutor(max_workers=io_workers(workers)) as executor:
+        for src, dst in executor.map(locate, names):
+            if dst is None:
+                continue
+            if dst in claimed or os.path.lexists(dst):
+                plan.conflicts.append(f"'{dst}' already exists, leaving '{src}'")
+                continue
+            claimed.add(dst)
+            plan.moves.append((src, dst))
+    return plan
+
+def apply_plan(plan, workers=None, copy_workers=4, batch_size=256):
+    """
+    Moves files with plain os.rename in batches on a thread pool. Moves that
+    cross filesystems are handed to a small copy pool (copy2, then unlink).
+    Returns (moved, failures).
+    """
+    failures = []
+    moves = []
+    broken = {}
+    for src, dst in plan.moves:
+        folder = os.path.dirname(dst)
+        if folder not in broken:
+            try:
+                os.makedirs(folder, exist_ok=True)
+                broken[folder] = None
+            except OSError as e:
+                broken[folder] = e
+        if broken[folder] is None:
+            moves.append((src, dst))
+        else:
+            failures.append((src, broken[folder]))
+
+    moved = [0]
+    lock = threading.Lock()
+    copy_pool = ThreadPoolExecutor(max_workers=copy_workers)
+
+    def copy_move(src, dst):
+        try:
+            shutil.copy2(src, dst)
+            os.unlink(src)
+            with lock:
+                moved[0] += 1
+        except OSError as e:
+            with lock:
+                failures.append((src, e))
+
+    def rename_batch(batch):
+        for src, dst in batch:
+            try:
+                os.rename(src, dst)
+                with lock:
+                    moved[0] += 1
+            except OSError as e:
+                if e.errno == errno.EXDEV:
+                    copy_pool.submit(copy_move, src, dst)
+                else:
+                    with lock:
+                        failures.append((src, e))
+
+    batches = [moves[i:i + batch_size] for i in range(0, len(moves), batch_size)]
+    with ThreadPoolExecutor(max_workers=io_workers(workers)) as executor:
+        list(executor.map(rename_batch, batches))
+    copy_pool.shutdown(wait=True)
+    return moved[0], failures
@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import threading
+
+# Flush to the OS every FLUSH_EVERY records, fsync at most every FSYNC_SECONDS
+FLUSH_EVERY = 64
+FSYNC_SECONDS = 1.0
+
+def list_generations(path, log_name):
+    """Returns [(generation, file_path)] oldest first. A legacy `log_name` file counts as generation 0."""
+    prefix = f"{log_name}."
+    generations = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.name == log_name:
+                generations.append((0, entry.path))
+            elif entry.name.startswith(prefix) and entry.name[len(prefix):].isdigit():
+                generations.append((int(entry.name[len(prefix):]), entry.path))
+    return sorted(generations)
+
+class RenameJournal:
+    """
+    Append-only journal of one rename run, written while the renames happen.
+    Each line is a JSON [new, old] pair of paths relative to the folder, so
+    any character in a name round-trips. Every run gets its own generation
+    file next to the previous ones.
+    """
+
+    def __init__(self, path, log_name):
+        self.path = path
+        generations = list_generations(path, log_name)
+        self.generation = generations[-1][0] + 1 if generations else 1
+        self.journal_path = os.path.join(path, f"{log_name}.{self.generation}")
+        self.file = open(self.journal_path, "a", encoding="utf-8", buffering=1024 * 1024)
+        self.lock = threading.Lock()
+        self.count = 0
+        self.last_sync = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record(self, new_rel, old_rel):
+        line = json.dumps([new_rel, old_rel]) + "\n"
+        with self.lock:
+            self.file.write(line)
+            self.count += 1
+            if self.count % FLUSH_EVERY == 0:
+                self.file.flush()
+                if time.monotonic() - self.last_sync >= FSYNC_SECONDS:
+                    os.fsync(self.file.fileno())
+                    self.last_sync = time.monotonic()
+
+    def record_intents(self, directory, wave):
+        """
+        Records [(old, new)] names in `directory` before they are renamed and
+        hands them to the OS, so a crash mid-wave still leaves them in the journal.
+        """
+        lines = "".join(
+            json.dumps([os.path.relpath(os.path.join(directory, new), self.path),
+                        os.path.relpath(os.path.join(directory, old), self.path)]) + "\n"
+            for old, new in wave
+        )
+        with self.lock:
+            self.file.write(lines)
+            self.count += len(wave)
+            self.file.flush()
+            if time.monotonic() - self.last_sync >= FSYNC_SECONDS:
+                os.fsync(self.file.fileno())
+                self.last_sync = time.monotonic()
+
+    def flush(self):
+        with self.lock:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        if self.count == 0:
+            os.remove(self.journal_path)
+
+def _reverse_lines(file_path, block_size=64 * 1024):
+    """Yields the lines of a file last to first, holding one block in memory at a time."""
+    with open(file_path, "rb") as file:
+        file.seek(0, os.SEEK_END)
+        position = file.tell()
+        tail = b""
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            file.seek(position)
+            chunk = file.read(step) + tail
+            lines = chunk.split(b"\n")
+            tail = lines.pop(0)
+            for line in reversed(lines):
+                if line:
+                    yield line
+        if tail:
+            yield tail
+
+def _entries(generation, file_path):
+    for line in _reverse_lines(file_path):
+        text = line.decode("utf-8", "surrogateescape")
+        if generation == 0:
+            # Legacy log: "new|old" per line
+            yield tuple(text.strip().split("|", 1))
+            continue
+        try:
+            yield tuple(json.loads(text))
+        except ValueError:
+            # Torn last line from a crashed run
+            continue
+
+def _write_entries(generation, file_path, entries):
+    """Replaces a generation file with `entries` (oldest first), in that generation's format."""
+    temp_path = file_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8", errors="surrogateescape") as file:
+        for new_name, old_name in entries:
+            file.write(f"{new_name}|{old_name}\n" if generation == 0 else json.dumps([new_name, old_name]) + "\n")
+    os.replace(temp_path, file_path)
+
+def undo_generations(path, log_name, to_generation=None):
+    """
+    Undoes the newest generation, or every generation down to and including
+    `to_generation`, newest first and each one streamed in reverse. Entries
+    whose new name is gone (the rename never happened after its intent was
+    journaled, or the item was removed since) are skipped. A generation with failed undos keeps just those entries.
+    """
+    generations = list_generations(path, log_name)
+    if not generations:
+        print("❌ No rename log found to undo.")
+        return
+
+    if to_generation is None:
+        to_generation = generations[-1][0]
+
+    for generation, file_path in reversed(generations):
+        if generation < to_generation:
+            break
+        undone = skipped = 0
+        failed = []
+        for new_name, old_name in _entries(generation, file_path):
+            new_path, old_path = os.path.join(path, new_name), os.path.join(path, old_name)
+            if not os.path.lexists(new_path):
+                skipped += 1
+                continue
+            try:
+                os.rename(new_path, old_path)
+                undone += 1
+            except OSError as e:
+                failed.append((new_name, old_name))
+                print(f"❌ Failed to undo '{new_name}': {e}")
+        if failed:
+            _write_entries(generation, file_path, reversed(failed))
+            print(f"↩️ Generation {generation}: undone {undone}, failed {len(failed)} (kept in '{os.path.basename(file_path)}')")
+            # Older generations may depend on these names, stop here
+            break
+        os.remove(file_path)
+        print(f"↩️ Generation {generation}: undone {undone}, skipped {skipped} missing")
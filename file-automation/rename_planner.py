@@ -0,0 +1,163 @@
+import os
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+def io_workers(workers=None):
+    """Thread count for I/O-bound pools: `workers` if given, else 4 per CPU, capped at 32."""
+    return workers or min(32, (os.cpu_count() or 1) * 4)
+
+class RenamePlan:
+    """
+    Every rename to perform, grouped per directory and ordered deepest-first,
+    so children are renamed while their parent still has its old name.
+    Each directory holds a list of waves; renames inside a wave never touch the
+    same name and can run in parallel. `conflicts` lists what blocks the plan.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.directories = []
+        self.conflicts = []
+
+    def __len__(self):
+        return sum(len(wave) for _, waves in self.directories for wave in waves)
+
+def prefix_namer(prefix, log_file):
+    def new_name(item, is_dir):
+        # Skip if already has the prefix
+        if item.startswith(f"{prefix}-") or item.startswith(log_file):
+            return None
+        return f"{prefix}-{item}"
+    return new_name
+
+def suffix_namer(suffix, log_file):
+    def new_name(item, is_dir):
+        if item.startswith(log_file):
+            return None
+        if is_dir:
+            # Skip if already has suffix
+            return None if item.endswith(suffix) else f"{item} {suffix}"  # for folders
+        # Files carry the suffix before their extension
+        name, ext = os.path.splitext(item)
+        if name.endswith(suffix):
+            return None
+        return f"{name}{suffix}{ext}"
+    return new_name
+
+def _order_waves(directory, renames, existing, conflicts):
+    """Orders renames so a target name is only taken once its current owner has moved away."""
+    targets = {}
+    for old, new in renames:
+        targets.setdefault(new, []).append(old)
+
+    renamed = {old for old, _ in renames}
+    sources = {}
+    for old, new in renames:
+        if len(targets[new]) > 1:
+            conflicts.append(f"'{os.path.join(directory, new)}' is the target of {len(targets[new])} renames")
+        elif new in existing and new not in renamed:
+            conflicts.append(f"'{os.path.join(directory, new)}' already exists")
+        else:
+            sources[old] = new
+
+    occupied = set(existing)
+    waves = []
+    while sources:
+        wave = [(old, new) for old, new in sources.items() if new not in occupied]
+        if not wave:
+            # Every remaining target is held by another pending rename: a cycle
+            for old, new in sources.items():
+                conflicts.append(f"'{os.path.join(directory, old)}' → '{new}' is part of a rename cycle")
+            break
+        for old, new in wave:
+            del sources[old]
+            occupied.discard(old)
+            occupied.add(new)
+        waves.append(wave)
+    return waves
+
+def build_plan(root, rename_fn, recursive=False):
+    """
+    Scans `root` (and every subdirectory when `recursive`) with os.scandir and
+    asks `rename_fn(name, is_dir)` for each entry's new name, or None to keep it.
+    """
+    plan = RenamePlan(root)
+    pending = [(root, 0)]
+    found = []
+
+    while pending:
+        directory, depth = pending.pop()
+        renames, existing = [], set()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    existing.add(entry.name)
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if recursive and is_dir:
+                        pending.append((entry.path, depth + 1))
+                    new_name = rename_fn(entry.name, is_dir)
+                    if new_name and new_name != entry.name:
+                        renames.append((entry.name, new_name))
+        except OSError as e:
+            plan.conflicts.append(f"'{directory}' could not be read: {e}")
+            continue
+        if renames:
+            found.append((depth, directory, _order_waves(directory, renames, existing, plan.conflicts)))
+
+    found.sort(key=lambda item: item[0], reverse=True)
+    plan.directories = [(directory, waves) for _, directory, waves in found]
+    return plan
+
+def build_names_plan(directory, names, rename_fn):
+    """
+    Plans renames for just `names` inside `directory`, checking collisions
+    per target instead of listing the folder, so the cost follows len(names).
+    """
+    plan = RenamePlan(directory)
+    renames, existing = [], set()
+    for name in set(names):
+        try:
+            st = os.lstat(os.path.join(directory, name))
+        except OSError:
+            continue
+        existing.add(name)
+        new_name = rename_fn(name, stat.S_ISDIR(st.st_mode))
+        if new_name and new_name != name:
+            renames.append((name, new_name))
+            if os.path.lexists(os.path.join(directory, new_name)):
+                existing.add(new_name)
+    if renames:
+        plan.directories = [(directory, _order_waves(directory, renames, existing, plan.conflicts))]
+    return plan
+
+def apply_plan(plan, on_renamed=None, workers=None, before_wave=None):
+    """
+    Applies a conflict-free plan directory by directory, each wave on a thread
+    pool. `before_wave(directory, wave)` gets each wave's [(old, new)] names
+    before any of them is renamed, so a journal can record intent first.
+    `on_renamed(old_path, new_path)` is called after every rename, from
+    whichever thread did it. Returns the list of (old_path, error) failures.
+    """
+    failures = []
+    lock = threading.Lock()
+
+    def rename(directory, old, new):
+        old_path = os.path.join(directory, old)
+        new_path = os.path.join(directory, new)
+        try:
+            os.rename(old_path, new_path)
+        except OSError as e:
+            with lock:
+                failures.append((old_path, e))
+            return
+        if on_renamed is not None:
+            on_renamed(old_path, new_path)
+
+    with ThreadPoolExecutor(max_workers=io_workers(workers)) as executor:
+        for directory, waves in plan.directories:
+            for wave in waves:
+                if before_wave is not None:
+                    before_wave(directory, wave)
+                list(executor.map(lambda item: rename(directory, *item), wave))
+    return failures
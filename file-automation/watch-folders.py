@@ -0,0 +1,210 @@
+import os
+import sys
+import json
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+
+from organizer import apply_plan as apply_organize_plan, build_plan as build_organize_plan, make_rule
+from rename_planner import apply_plan, build_names_plan, prefix_namer, suffix_namer
+from rename_journal import RenameJournal
+
+# Same log names as the prefix/suffix scripts, so their undo covers what the watcher renamed
+PREFIX_LOG_FILE = ".rename_log.txt"
+SUFFIX_LOG_FILE = ".suffix_rename_log.txt"
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct("iIII")
+
+# Example config:
+# {
+#     "debounce": 2.0,
+#     "watches": [
+#         {"path": "/Users/me/Downloads", "action": "organize", "rule": "extension"},
+#         {"path": "/Users/me/Scans", "action": "prefix", "value": "scan"},
+#         {"path": "/Users/me/Old", "action": "suffix", "value": "_old"}
+#     ]
+# }
+
+class InotifyWatcher:
+    """Reports names created or moved into the watched folders, via Linux inotify."""
+
+    def __init__(self, paths):
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.paths = {}
+        for path in paths:
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), IN_CREATE | IN_MOVED_TO | IN_CLOSE_WRITE)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+            self.paths[wd] = path
+
+    def poll(self, timeout):
+        """Returns [(folder, name)] seen within `timeout` seconds."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        data = os.read(self.fd, 64 * 1024)
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if name and wd in self.paths:
+                events.append((self.paths[wd], os.fsdecode(name)))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Fallback for systems without inotify: diffs a listing of each folder every `interval` seconds."""
+
+    def __init__(self, paths, interval=2.0):
+        self.interval = interval
+        self.listings = {path: self._list(path) for path in paths}
+
+    def _list(self, path):
+        try:
+            with os.scandir(path) as it:
+                return {entry.name for entry in it}
+        except OSError:
+            return set()
+
+    def poll(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        events = []
+        for path, before in self.listings.items():
+            after = self._list(path)
+            events.extend((path, name) for name in after - before)
+            self.listings[path] = after
+        return events
+
+    def close(self):
+        pass
+
+class FolderRule:
+    def __init__(self, config):
+        self.path = config["path"]
+        self.action = config["action"]
+        self.journal = None
+        # Names this rule renamed things to; their own create/move events are not new entries
+        self.produced = set()
+        if self.action == "prefix":
+            self.namer = prefix_namer(config["value"], PREFIX_LOG_FILE)
+            self.journal = RenameJournal(self.path, PREFIX_LOG_FILE)
+        elif self.action == "suffix":
+            self.namer = suffix_namer(config["value"], SUFFIX_LOG_FILE)
+            self.journal = RenameJournal(self.path, SUFFIX_LOG_FILE)
+        elif self.action == "organize":
+            self.folder_for = make_rule(config.get("rule", "stem"), config.get("date_format", "%Y/%m"), config.get("pattern"))
+            self.destination = config.get("destination")
+        else:
+            raise ValueError(f"Unknown action '{self.action}', expected prefix, suffix or organize")
+
+    def apply(self, names):
+        names = set(names)
+        own = names & self.produced
+        self.produced -= own
+        names -= own
+        if not names:
+            return
+
+        if self.action == "organize":
+            # Only plain files are organized, the folders it creates are ignored
+            names = [name for name in names if os.path.isfile(os.path.join(self.path, name))]
+            plan = build_organize_plan(self.path, self.folder_for, self.destination, names=names)
+            for conflict in plan.conflicts:
+                print(f"⚠️ {conflict}")
+            moved, failures = apply_organize_plan(plan)
+            for src, e in failures:
+                print(f"❌ Failed to move '{src}': {e}")
+            if moved:
+                print(f"✅ {self.path}: moved {moved} new files")
+            return
+
+        plan = build_names_plan(self.path, names, self.namer)
+        for conflict in plan.conflicts:
+            print(f"⚠️ {conflict}")
+        if plan.conflicts:
+            return
+
+        def renamed(old_path, new_path):
+            self.produced.add(os.path.basename(new_path))
+
+        failures = apply_plan(plan, on_renamed=renamed, before_wave=self.journal.record_intents)
+        self.journal.flush()
+        for old_path, e in failures:
+            print(f"❌ Failed to rename '{old_path}': {e}")
+        if len(plan):
+            print(f"✅ {self.path}: renamed {len(plan) - len(failures)} new items")
+
+    def close(self):
+        if self.journal is not None:
+            self.journal.close()
+
+def watch(config):
+    rules = {}
+    for entry in config["watches"]:
+        rule = FolderRule(entry)
+        rules[rule.path] = rule
+    debounce = config.get("debounce", 2.0)
+
+    try:
+        watcher = InotifyWatcher(list(rules))
+        print("👀 Watching with inotify")
+    except (OSError, AttributeError):
+        watcher = PollingWatcher(list(rules), config.get("poll_interval", debounce))
+        print("👀 Watching by polling")
+
+    pending = {}
+    first_event = last_event = 0.0
+    try:
+        while True:
+            events = watcher.poll(debounce)
+            for path, name in events:
+                if not pending:
+                    first_event = time.monotonic()
+                pending.setdefault(path, set()).add(name)
+                last_event = time.monotonic()
+
+            # Act once a burst has been quiet for `debounce` seconds, or has run for 10x that
+            now = time.monotonic()
+            if pending and (now - last_event >= debounce or now - first_event >= 10 * debounce):
+                batch, pending = pending, {}
+                for path, names in batch.items():
+                    rules[path].apply(names)
+    except KeyboardInterrupt:
+        print("\n🛑 Stopped watching.")
+    finally:
+        watcher.close()
+        for rule in rules.values():
+            rule.close()
+
+def main():
+    config_path = sys.argv[1] if len(sys.argv) > 1 else input("Enter the watch config (JSON) path: ").strip()
+    if not os.path.isfile(config_path):
+        print(f"❌ Error: '{config_path}' is not a valid file.")
+        return
+
+    with open(config_path, "r") as f:
+        config = json.load(f)
+
+    for entry in config.get("watches", []):
+        if not os.path.isdir(entry.get("path", "")):
+            print(f"❌ Error: '{entry.get('path')}' is not a valid directory.")
+            return
+
+    watch(config)
+
+if __name__ == "__main__":
+    main()
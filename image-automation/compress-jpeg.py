@@ -1,6 +1,10 @@
+import io
 import os
 import sys
+import math
+import time
 import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # 📦 Auto-install Pillow if missing
 try:
@@ -10,56 +14,208 @@ except ImportError:
     subprocess.check_call([sys.executable, "-m", "pip", "install", "pillow"])
     from PIL import Image
 
-def compress_to_target(input_path, output_path=None, target_size=1024 * 1024):
+COMPRESSED_SUFFIX = "_compressed"
+MIN_QUALITY, MAX_QUALITY = 5, 95
+TRIAL_QUALITIES = (5, 25, 50, 75, 95)
+# Stop searching once the output uses this much of the target
+FIT_RATIO = 0.95
+MAX_SHRINKS = 3
+
+def default_output_path(input_path):
+    base, _ = os.path.splitext(input_path)
+    return f"{base}{COMPRESSED_SUFFIX}.jpg"
+
+def _encode(img, quality):
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=quality, optimize=True)
+    return buffer.getvalue()
+
+def _size_model(img):
+    """
+    Encodes a quarter-size copy at a few qualities and scales the sizes by the
+    pixel ratio, giving [(quality, log(estimated full size))] ascending.
+    """
+    trial = img.copy()
+    trial.thumbnail((max(1, img.width // 4), max(1, img.height // 4)))
+    ratio = (img.width * img.height) / (trial.width * trial.height)
+    return [(q, math.log(len(_encode(trial, q)) * ratio)) for q in TRIAL_QUALITIES]
+
+def _model_log_size(points, q):
+    for (q1, s1), (q2, s2) in zip(points, points[1:]):
+        if q <= q2:
+            return s1 + (s2 - s1) * (q - q1) / (q2 - q1)
+    return points[-1][1]
+
+def _model_quality(points, log_size):
+    for (q1, s1), (q2, s2) in zip(points, points[1:]):
+        if log_size <= s2 and s2 > s1:
+            return q1 + (q2 - q1) * max(0.0, log_size - s1) / (s2 - s1)
+    return points[-1][0]
+
+def _search_quality(img, target_size, log):
+    """
+    Interpolation search for the highest quality that fits `target_size`.
+    The first guesses come from a downscaled trial; once one probe fits and
+    another doesn't, the next quality is interpolated between those two
+    measured sizes. Stops when the bounds meet or the fit is within 95%.
+    Returns ((quality, jpeg_bytes) or None, size at quality 5 if probed).
+    """
+    points = _size_model(img)
+    goal = math.log(target_size * 0.98)
+    offset = 0.0
+    lo, hi = None, None
+    smallest = None
+    q = min(MAX_QUALITY, max(MIN_QUALITY, round(_model_quality(points, goal))))
+
+    while True:
+        data = _encode(img, q)
+        log(f"🔍 Trying quality {q}: {len(data) / 1024:.2f} KB")
+        if q == MIN_QUALITY:
+            smallest = len(data)
+
+        if len(data) <= target_size:
+            if lo is None or q > lo[0]:
+                lo = (q, data)
+        elif hi is None or q < hi[0]:
+            hi = (q, len(data))
+
+        top = hi[0] if hi is not None else MAX_QUALITY + 1
+        if lo is not None and (top - lo[0] <= 1 or len(lo[1]) >= target_size * FIT_RATIO):
+            break
+        floor = lo[0] + 1 if lo is not None else MIN_QUALITY
+        if floor >= top:
+            break
+
+        if lo is not None and hi is not None:
+            # Both sides measured: interpolate in log-size between the two real probes
+            lo_log, hi_log = math.log(len(lo[1])), math.log(hi[1])
+            guess = lo[0] + (hi[0] - lo[0]) * (goal - lo_log) / (hi_log - lo_log) if hi_log > lo_log else floor
+        else:
+            # The trial misjudges the full image by a roughly constant factor
+            offset = math.log(len(data)) - _model_log_size(points, q)
+            guess = _model_quality(points, goal - offset)
+        q = min(top - 1, max(floor, round(guess)))
+
+    return lo, smallest
+
+def compress_to_target(input_path, output_path=None, target_size=1024 * 1024, verbose=True, shrink=False):
+    """
+    Returns (quality, output_size) on success, None otherwise. With `shrink`,
+    images that miss the target even at quality 5 are scaled down until they fit.
+    """
+    log = print if verbose else (lambda *args, **kwargs: None)
+
     if not os.path.isfile(input_path):
-        print("❌ File not found.")
+        log("❌ File not found.")
         return
 
     if not input_path.lower().endswith((".jpg", ".jpeg")):
-        print("❌ Only JPEG files are supported.")
+        log("❌ Only JPEG files are supported.")
         return
 
     if not output_path:
-        base, _ = os.path.splitext(input_path)
-        output_path = f"{base}_compressed.jpg"
+        output_path = default_output_path(input_path)
 
     try:
         img = Image.open(input_path)
     except Exception as e:
-        print(f"❌ Failed to open image: {e}")
+        log(f"❌ Failed to open image: {e}")
         return
 
     if img.mode != 'RGB':
         img = img.convert('RGB')
 
-    min_q, max_q = 5, 95
-    best_quality = None
-    temp_file = output_path + ".temp.jpg"
+    for _ in range(MAX_SHRINKS + 1):
+        best, smallest = _search_quality(img, target_size, log)
+        if best is not None or not shrink:
+            break
+        # Even quality 5 is too big: shrink the picture and search again
+        scale = math.sqrt(target_size / smallest) * 0.9
+        img = img.resize((max(1, int(img.width * scale)), max(1, int(img.height * scale))), Image.LANCZOS)
+        log(f"📐 Quality 5 is {smallest / 1024:.2f} KB, shrinking to {img.width}x{img.height}")
+
+    if best:
+        best_quality, data = best
+        # The winning probe is already encoded, write its buffer as-is
+        with open(output_path, "wb") as f:
+            f.write(data)
+        final_size = len(data)
+        log(f"\n✅ Saved: {output_path} ({final_size / 1024:.2f} KB) at quality {best_quality}")
+        return best_quality, final_size
+    else:
+        log("❌ Could not compress below target size.")
+
+def _compress_job(input_path, target_size, shrink=False):
+    start = time.monotonic()
+    try:
+        result = compress_to_target(input_path, target_size=target_size, verbose=False, shrink=shrink)
+    except Exception:
+        result = None
+    return input_path, result, time.monotonic() - start
 
-    while min_q <= max_q:
-        q = (min_q + max_q) // 2
-        img.save(temp_file, format="JPEG", quality=q, optimize=True)
-        size = os.path.getsize(temp_file)
-        print(f"🔍 Trying quality {q}: {size / 1024:.2f} KB")
+def collect_jpegs(path, recursive=False):
+    jpegs = []
+    for root, _, files in os.walk(path):
+        for f in sorted(files):
+            base, ext = os.path.splitext(f)
+            if ext.lower() in (".jpg", ".jpeg") and not base.endswith(COMPRESSED_SUFFIX):
+                jpegs.append(os.path.join(root, f))
+        if not recursive:
+            break
+    return jpegs
 
-        if size <= target_size:
-            best_quality = q
-            min_q = q + 1
+def compress_folder(path, target_size=1024 * 1024, recursive=False, workers=None, shrink=False):
+    """
+    Compresses every JPEG in `path` on a process pool, one worker per core.
+    Skips files already under the target and files whose output is newer.
+    """
+    jobs, skipped = [], 0
+    for input_path in collect_jpegs(path, recursive):
+        output_path = default_output_path(input_path)
+        input_stat = os.stat(input_path)
+        if input_stat.st_size <= target_size:
+            skipped += 1
+        elif os.path.exists(output_path) and os.path.getmtime(output_path) >= input_stat.st_mtime:
+            skipped += 1
         else:
-            max_q = q - 1
+            jobs.append((input_path, input_stat.st_size))
 
-    if best_quality:
-        img.save(output_path, format="JPEG", quality=best_quality, optimize=True)
-        os.remove(temp_file)
-        final_size = os.path.getsize(output_path) / 1024
-        print(f"\n✅ Saved: {output_path} ({final_size:.2f} KB) at quality {best_quality}")
-    else:
-        print("❌ Could not compress below target size.")
-        os.remove(temp_file)
+    print(f"📂 {len(jobs)} to compress, {skipped} skipped (already small enough or up to date)")
+    if not jobs:
+        return
+
+    saved = done = failed = 0
+    input_bytes = 0
+    qualities = {}
+    start = time.monotonic()
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = {executor.submit(_compress_job, input_path, target_size, shrink): size for input_path, size in jobs}
+        for future in as_completed(futures):
+            input_path, result, seconds = future.result()
+            done += 1
+            input_bytes += futures[future]
+            if result is None:
+                failed += 1
+                print(f"❌ [{done}/{len(jobs)}] {input_path}: could not reach target size")
+            else:
+                quality, output_size = result
+                saved += futures[future] - output_size
+                qualities[input_path] = quality
+                print(f"✅ [{done}/{len(jobs)}] {input_path}: q{quality}, {output_size / 1024:.0f} KB in {seconds:.1f}s")
+
+    elapsed = time.monotonic() - start
+    print(f"\n📊 {done - failed} compressed, {failed} failed, {skipped} skipped")
+    print(f"💾 Saved {saved / (1024 * 1024):.2f} MB in {elapsed:.1f}s "
+          f"({done / elapsed:.1f} files/s, {input_bytes / (1024 * 1024) / elapsed:.1f} MB/s)")
+    if qualities:
+        average = sum(qualities.values()) / len(qualities)
+        print(f"🎚️ Quality: min {min(qualities.values())}, avg {average:.0f}, max {max(qualities.values())}")
+    return qualities
 
 # 🏃 Main runner
 if __name__ == "__main__":
-    input_file = input("📷 Enter path to JPEG file: ").strip().strip('"')
+    input_file = input("📷 Enter path to JPEG file or folder: ").strip().strip('"')
 
     size_mb = input("📦 Max output size in MB (default: 1): ").strip()
     try:
@@ -68,4 +224,10 @@ if __name__ == "__main__":
         print("❌ Invalid size input, defaulting to 1 MB.")
         target_bytes = 1024 * 1024
 
-    compress_to_target(input_file, target_size=target_bytes)
+    shrink = input("📐 Shrink dimensions if quality alone can't reach the size? (y/n): ").strip().lower() == 'y'
+
+    if os.path.isdir(input_file):
+        recursive = input("🔁 Include subfolders? (y/n): ").strip().lower() == 'y'
+        compress_folder(input_file, target_size=target_bytes, recursive=recursive, shrink=shrink)
+    else:
+        compress_to_target(input_file, target_size=target_bytes, shrink=shrink)
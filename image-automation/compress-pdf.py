@@ -1,9 +1,9 @@
 import os
 import sys
+import hashlib
 import subprocess
-import io
 
-# Auto-install PyMuPDF and Pillow
+# Auto-install PyMuPDF
 def install(package):
     subprocess.check_call([sys.executable, "-m", "pip", "install", package])
 
@@ -13,13 +13,16 @@ except ImportError:
     install("pymupdf")
     import fitz
 
-try:
-    from PIL import Image
-except ImportError:
-    install("pillow")
-    from PIL import Image
+from page_render import parse_page_range, render_pages
+from pdf_stream import PdfStreamWriter
 
-def compress_pdf(input_path, output_path=None, image_quality=70, scale=0.5, remove_metadata=True):
+METADATA_KEYS = ("title", "author", "subject", "keywords", "creator")
+
+def compress_pdf(input_path, output_path=None, image_quality=70, scale=0.5, remove_metadata=True, page_range=None, workers=None):
+    """
+    Rasterises each page to a JPEG at `scale` on all cores and streams them
+    into a new PDF. `page_range` keeps only some pages, e.g. "1-3,7".
+    """
     if not os.path.isfile(input_path):
         print("❌ File not found.")
         return
@@ -33,42 +36,127 @@ def compress_pdf(input_path, output_path=None, image_quality=70, scale=0.5, remo
         output_path = base + "_compressed.pdf"
 
     print(f"📥 Opening: {input_path}")
-    doc = fitz.open(input_path)
-    new_doc = fitz.open()
+    with fitz.open(input_path) as doc:
+        page_count = len(doc)
+        info = {} if remove_metadata else {key.capitalize(): doc.metadata.get(key) for key in METADATA_KEYS}
+
+    try:
+        pages = parse_page_range(page_range, page_count)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
 
-    for page_num in range(len(doc)):
-        page = doc.load_page(page_num)
-        mat = fitz.Matrix(scale, scale)
-        pix = page.get_pixmap(matrix=mat)
+    # One pixel per point, the page size the rendered image had before
+    with PdfStreamWriter(output_path, dpi=72, info=info) as writer:
+        for page_num, data, width, height in render_pages(input_path, pages, zoom=scale, quality=image_quality, workers=workers):
+            writer.add_jpeg(data, width, height)
+            print(f"📄 Compressed page {page_num+1}/{page_count}")
 
-        # Convert pixmap to PIL image
-        mode = "RGB" if pix.alpha == 0 else "RGBA"
-        image = Image.frombytes(mode, [pix.width, pix.height], pix.samples)
+    final_size = os.path.getsize(output_path) / 1024
+    print(f"\n✅ Compressed PDF saved: {output_path} ({final_size:.2f} KB)")
+
+def _image_dpi(page, xref, width, height):
+    """Highest resolution the image is shown at on `page`, in pixels per inch."""
+    dpi = 0
+    for info in page.get_image_info(xrefs=True):
+        if info["xref"] != xref:
+            continue
+        x0, y0, x1, y1 = info["bbox"]
+        shown = max(abs(x1 - x0), abs(y1 - y0)) / 72
+        if shown:
+            dpi = max(dpi, max(width, height) / shown)
+    return dpi
+
+def compress_pdf_images(input_path, output_path=None, target_dpi=150, image_quality=70, remove_metadata=True, page_range=None):
+    """
+    Keeps text and vector content as they are and only recompresses embedded
+    raster images: each is downsampled to `target_dpi` (at its largest size on
+    any page) and re-encoded as JPEG, keeping the result only if it is smaller.
+    Identical images are encoded once, and garbage=4 merges their copies on save.
+    """
+    if not os.path.isfile(input_path):
+        print("❌ File not found.")
+        return
 
-        # Save image to memory buffer with quality
-        img_buffer = io.BytesIO()
-        image.save(img_buffer, format="JPEG", quality=image_quality, optimize=True)
-        img_buffer.seek(0)
+    if not input_path.lower().endswith(".pdf"):
+        print("❌ Only PDF files are supported.")
+        return
 
-        # Insert image into new PDF
-        img_rect = fitz.Rect(0, 0, pix.width, pix.height)
-        new_page = new_doc.new_page(width=pix.width, height=pix.height)
-        new_page.insert_image(img_rect, stream=img_buffer.read())
+    if output_path is None:
+        base, _ = os.path.splitext(input_path)
+        output_path = base + "_compressed.pdf"
 
-        print(f"📄 Compressed page {page_num+1}/{len(doc)}")
+    print(f"📥 Opening: {input_path}")
+    doc = fitz.open(input_path)
+    try:
+        pages = parse_page_range(page_range, len(doc))
+    except ValueError as e:
+        print(f"❌ {e}")
+        doc.close()
+        return
+    if len(pages) != len(doc):
+        doc.select(pages)
+
+    # First pass: where each image is used and the highest DPI it is shown at
+    images = {}
+    for page in doc:
+        for xref, smask, width, height, bpc, colorspace, _, _, _, _ in page.get_images(full=True):
+            # Masked, 1-bit and odd colour space images are left alone
+            if not xref or smask or bpc < 8 or colorspace not in ("DeviceRGB", "DeviceGray", "ICCBased", "DeviceCMYK"):
+                continue
+            dpi = _image_dpi(page, xref, width, height)
+            entry = images.setdefault(xref, {"page": page.number, "dpi": 0})
+            entry["dpi"] = max(entry["dpi"], dpi)
+
+    encoded = {}
+    replaced = deduplicated = saved = 0
+    for xref, entry in images.items():
+        raw = doc.xref_stream_raw(xref)
+        if raw is None:
+            continue
+        digest = hashlib.blake2b(raw, digest_size=16).digest()
+        if digest in encoded:
+            data = encoded[digest]
+            deduplicated += 1
+        else:
+            data = None
+            try:
+                pix = fitz.Pixmap(doc, xref)
+                if pix.alpha:
+                    pix = None
+                elif pix.colorspace is None or pix.colorspace.n not in (1, 3):
+                    pix = fitz.Pixmap(fitz.csRGB, pix)
+            except (RuntimeError, ValueError):
+                pix = None
+            if pix is not None:
+                scale = target_dpi / entry["dpi"] if entry["dpi"] else 1.0
+                if scale < 0.9:
+                    pix = fitz.Pixmap(pix, max(1, int(pix.width * scale)), max(1, int(pix.height * scale)), None)
+                candidate = pix.tobytes("jpeg", jpg_quality=image_quality)
+                if len(candidate) < len(raw):
+                    data = candidate
+            encoded[digest] = data
+        if data is None:
+            continue
+        doc[entry["page"]].replace_image(xref, stream=data)
+        replaced += 1
+        saved += len(raw) - len(data)
 
     if remove_metadata:
-        new_doc.set_metadata({})
+        doc.set_metadata({})
+        doc.del_xml_metadata()
 
-    new_doc.save(output_path)
+    doc.save(output_path, garbage=4, deflate=True)
     doc.close()
-    new_doc.close()
 
     final_size = os.path.getsize(output_path) / 1024
+    print(f"🖼️ {replaced} of {len(images)} images recompressed ({deduplicated} duplicates), "
+          f"{saved / 1024:.2f} KB of image data saved")
     print(f"\n✅ Compressed PDF saved: {output_path} ({final_size:.2f} KB)")
 
 if __name__ == "__main__":
     input_pdf = input("📂 Enter path to PDF: ").strip().strip('"')
+    mode = input("🧩 Mode: 'images' keeps text and only shrinks pictures, 'raster' re-renders every page (default: raster): ").strip().lower() or "raster"
 
     quality_input = input("🎚️ JPEG quality (10–95, default 70): ").strip()
     try:
@@ -78,12 +166,21 @@ if __name__ == "__main__":
         print("⚠️ Invalid input. Using default quality: 70.")
         quality = 70
 
-    scale_input = input("📏 Scale (0.3–1.0, default 0.5): ").strip()
-    try:
-        scale = float(scale_input) if scale_input else 0.5
-        if not (0.1 <= scale <= 1.0): raise ValueError
-    except:
-        print("⚠️ Invalid scale. Using 0.5.")
-        scale = 0.5
-
-    compress_pdf(input_pdf, image_quality=quality, scale=scale)
+    if mode == "images":
+        dpi_input = input("🔍 Target image DPI (default 150): ").strip()
+        target_dpi = int(dpi_input) if dpi_input.isdigit() and int(dpi_input) > 0 else 150
+    else:
+        scale_input = input("📏 Scale (0.3–1.0, default 0.5): ").strip()
+        try:
+            scale = float(scale_input) if scale_input else 0.5
+            if not (0.1 <= scale <= 1.0): raise ValueError
+        except:
+            print("⚠️ Invalid scale. Using 0.5.")
+            scale = 0.5
+
+    page_range = input("📑 Pages to keep (e.g. 1-3,7; Enter for all): ").strip()
+
+    if mode == "images":
+        compress_pdf_images(input_pdf, target_dpi=target_dpi, image_quality=quality, page_range=page_range)
+    else:
+        compress_pdf(input_pdf, image_quality=quality, scale=scale, page_range=page_range)
@@ -1,6 +1,8 @@
 import os
 import sys
+import time
 import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # Auto-install dependencies
 try:
@@ -9,13 +11,15 @@ except ImportError:
     subprocess.check_call([sys.executable, "-m", "pip", "install", "pillow"])
     from PIL import Image, UnidentifiedImageError
 
+# Only checked here: raw_decode needs rawpy (which brings numpy for image_cache),
+# so it has to be installed before those helpers are imported
 try:
     import rawpy
-    import imageio
 except ImportError:
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "rawpy", "imageio"])
-    import rawpy
-    import imageio
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "rawpy"])
+
+from raw_decode import decode_raw
+from image_cache import open_image
 
 # Supported formats
 COMMON_IMAGE_FORMATS = (
@@ -25,55 +29,165 @@ RAW_FORMATS = (
     '.cr2', '.nef', '.arw', '.orf', '.rw2', '.dng', '.raf', '.sr2', '.pef', '.raw'
 )
 SUPPORTED_FORMATS = COMMON_IMAGE_FORMATS + RAW_FORMATS
+JPEG_FORMATS = ('.jpg', '.jpeg')
+
+def _save_jpeg(img, output_path):
+    # Write next to the target and rename, so an interrupted run never leaves
+    # a truncated .jpg that incremental mode would take as up to date
+    temp_path = output_path + ".part"
+    img.save(temp_path, format='JPEG', quality=95)
+    os.replace(temp_path, output_path)
 
-def convert_raw_to_jpeg(input_path, output_path):
+def convert_raw_to_jpeg(input_path, output_path, max_size=None, strategy="auto"):
     try:
-        with rawpy.imread(input_path) as raw:
-            rgb = raw.postprocess()
-            imageio.imsave(output_path, rgb)
-            print(f"✅ RAW converted: {input_path} → {output_path}")
+        # Only a long side of `max_size` is needed, which often the embedded preview has
+        img = decode_raw(input_path, (max_size, 0) if max_size else None, strategy)
+        if max_size:
+            img.thumbnail((max_size, max_size), Image.LANCZOS)
+        _save_jpeg(img, output_path)
+        print(f"✅ RAW converted: {input_path} → {output_path}")
+        return True
     except Exception as e:
         print(f"❌ RAW conversion failed for {input_path}: {e}")
+        return False
 
-def convert_to_jpeg(input_path, output_dir=None):
+def jpeg_output_path(input_path, output_dir=None, source_root=None):
+    """
+    Where `input_path` converts to: next to it by default, or under
+    `output_dir` mirroring its folder relative to `source_root`.
+    """
+    base = os.path.splitext(os.path.basename(input_path))[0]
+    folder = os.path.dirname(input_path)
+    if output_dir:
+        relative = os.path.relpath(folder, source_root) if source_root else "."
+        folder = os.path.normpath(os.path.join(output_dir, relative))
+    return os.path.join(folder, f"{base}.jpg")
+
+def convert_to_jpeg(input_path, output_dir=None, output_path=None, max_size=None):
+    """Returns True if a JPEG was written. `max_size` caps the longest side in pixels."""
     ext = os.path.splitext(input_path)[1].lower()
     if ext not in SUPPORTED_FORMATS:
         print(f"❌ Skipping unsupported: {input_path}")
-        return
+        return False
 
-    base = os.path.splitext(os.path.basename(input_path))[0]
-    output_path = os.path.join(output_dir or os.path.dirname(input_path), f"{base}.jpg")
+    output_path = output_path or jpeg_output_path(input_path, output_dir)
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
 
     if ext in RAW_FORMATS:
-        convert_raw_to_jpeg(input_path, output_path)
-        return
+        return convert_raw_to_jpeg(input_path, output_path, max_size)
 
     try:
-        img = Image.open(input_path)
+        img = open_image(input_path)
         if img.mode in ("RGBA", "P"):
             img = img.convert("RGB")
-        img.save(output_path, format='JPEG', quality=95)
+        if max_size:
+            img.thumbnail((max_size, max_size), Image.LANCZOS)
+        _save_jpeg(img, output_path)
         print(f"✅ Converted: {input_path} → {output_path}")
+        return True
     except UnidentifiedImageError:
         print(f"⚠️ Unreadable image: {input_path}")
     except Exception as e:
         print(f"❌ Error converting {input_path}: {e}")
+    return False
 
-def convert_folder(path, recursive=False):
-    for root, _, files in os.walk(path):
-        for file in files:
-            full_path = os.path.join(root, file)
-            convert_to_jpeg(full_path)
+def _convert_job(input_path, output_path, max_size=None):
+    start = time.monotonic()
+    try:
+        ok = convert_to_jpeg(input_path, output_path=output_path, max_size=max_size)
+    except Exception:
+        ok = False
+    return input_path, ok, time.monotonic() - start
+
+def plan_folder(path, recursive=False, output_dir=None, incremental=True):
+    """
+    Returns ([(input_path, output_path)], skipped, conflicts). Outputs that
+    are newer than their source are skipped in incremental mode, and a
+    source is never converted onto itself, onto another source file or
+    onto another source's output.
+    """
+    sources = []
+    for root, dirs, files in os.walk(path):
+        if output_dir:
+            # Don't pick up our own outputs when they live inside the source tree
+            dirs[:] = [d for d in dirs if os.path.abspath(os.path.join(root, d)) != os.path.abspath(output_dir)]
+        sources.extend(os.path.join(root, file) for file in sorted(files) if file.lower().endswith(SUPPORTED_FORMATS))
         if not recursive:
             break
 
+    jobs, conflicts = [], []
+    skipped = 0
+    # Every source file is off limits as an output, e.g. foo.png must not replace foo.jpg.
+    # Paths are compared casefolded: on case-insensitive disks IMG_1.JPG and IMG_1.jpg are one file
+    source_paths = {os.path.abspath(source).casefold() for source in sources}
+    claimed = set()
+    for input_path in sources:
+        if not output_dir and input_path.lower().endswith(JPEG_FORMATS):
+            # Already a JPEG in place, re-encoding it would only replace the original
+            skipped += 1
+            continue
+        output_path = jpeg_output_path(input_path, output_dir, path)
+        target = os.path.abspath(output_path).casefold()
+        if target == os.path.abspath(input_path).casefold():
+            skipped += 1
+            continue
+        if target in source_paths:
+            conflicts.append(f"'{input_path}' would overwrite the source '{output_path}', use an output folder to keep both")
+            continue
+        if target in claimed:
+            conflicts.append(f"'{input_path}' would overwrite '{output_path}' from another source")
+            continue
+        claimed.add(target)
+        try:
+            if incremental and os.path.getmtime(output_path) >= os.path.getmtime(input_path):
+                skipped += 1
+                continue
+        except OSError:
+            pass
+        jobs.append((input_path, output_path))
+    return jobs, skipped, conflicts
+
+def convert_folder(path, recursive=False, output_dir=None, incremental=True, workers=None, max_size=None):
+    """
+    Converts every supported image in `path` on a process pool, one worker
+    per core. Returns the number of files converted.
+    """
+    jobs, skipped, conflicts = plan_folder(path, recursive, output_dir, incremental)
+    for conflict in conflicts:
+        print(f"⚠️ {conflict}")
+    print(f"📂 {len(jobs)} to convert, {skipped} skipped (already JPEG or up to date)")
+    if not jobs:
+        return 0
+
+    done = failed = 0
+    start = time.monotonic()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = [executor.submit(_convert_job, input_path, output_path, max_size) for input_path, output_path in jobs]
+        for future in as_completed(futures):
+            input_path, ok, seconds = future.result()
+            done += 1
+            if not ok:
+                failed += 1
+            if done % 100 == 0 or done == len(jobs):
+                print(f"⏳ {done}/{len(jobs)} done, {failed} failed")
+
+    elapsed = time.monotonic() - start
+    print(f"\n📊 {done - failed} converted, {failed} failed, {skipped} skipped in {elapsed:.1f}s "
+          f"({done / elapsed:.1f} files/s)")
+    return done - failed
+
 if __name__ == "__main__":
     target_path = input("📂 Enter file or folder path: ").strip().strip('"')
-    recursive = input("🔁 Search subfolders? (y/n): ").strip().lower() == 'y'
+    size_input = input("📏 Max longest side in pixels (Enter for full size): ").strip()
+    max_size = int(size_input) if size_input.isdigit() else None
 
     if os.path.isdir(target_path):
-        convert_folder(target_path, recursive=recursive)
+        recursive = input("🔁 Search subfolders? (y/n): ").strip().lower() == 'y'
+        output_dir = input("📁 Output folder [default: next to each source]: ").strip().strip('"') or None
+        incremental = input("⏭️ Skip files whose JPEG is already up to date? (y/n) [default: y]: ").strip().lower() != 'n'
+        convert_folder(target_path, recursive=recursive, output_dir=output_dir, incremental=incremental, max_size=max_size)
     elif os.path.isfile(target_path):
-        convert_to_jpeg(target_path)
+        output_dir = input("📁 Output folder [default: next to the source]: ").strip().strip('"') or None
+        convert_to_jpeg(target_path, output_dir, max_size=max_size)
     else:
         print("❌ Invalid path.")
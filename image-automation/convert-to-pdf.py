@@ -4,43 +4,55 @@ import subprocess
 
 # Auto-install required modules
 try:
-    from PIL import Image, UnidentifiedImageError
+    from PIL import Image, ImageOps, UnidentifiedImageError
 except ImportError:
     subprocess.check_call([sys.executable, "-m", "pip", "install", "pillow"])
-    from PIL import Image, UnidentifiedImageError
+    from PIL import Image, ImageOps, UnidentifiedImageError
 
+# Only checked here: raw_decode needs rawpy (which brings numpy for image_cache),
+# so it has to be installed before those helpers are imported
 try:
     import rawpy
-    import imageio
 except ImportError:
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "rawpy", "imageio"])
-    import rawpy
-    import imageio
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "rawpy"])
+
+from raw_decode import decode_raw
+from image_cache import open_image
+from pdf_stream import PdfStreamWriter, embeddable_jpeg
 
 # Supported formats
 RAW_FORMATS = ('.cr2', '.nef', '.arw', '.dng', '.orf', '.rw2', '.raf', '.sr2', '.pef', '.raw')
 COMMON_FORMATS = ('.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tiff', '.gif', '.heic', '.avif')
 ALL_FORMATS = COMMON_FORMATS + RAW_FORMATS
 
-def convert_raw_to_image(path):
+def convert_raw_to_image(path, max_size=None, strategy="auto"):
     try:
-        with rawpy.imread(path) as raw:
-            rgb = raw.postprocess()
-            return Image.fromarray(rgb)
+        return decode_raw(path, (max_size, 0) if max_size else None, strategy)
     except Exception as e:
         print(f"❌ RAW error: {path} — {e}")
         return None
 
-def convert_image_to_pdf(input_path):
+def convert_image_to_pdf(input_path, max_size=None):
+    """Saves `input_path` as a one-page PDF next to it. `max_size` caps the longest side in pixels."""
     ext = os.path.splitext(input_path)[1].lower()
     base = os.path.splitext(os.path.basename(input_path))[0]
     output_path = os.path.join(os.path.dirname(input_path), f"{base}.pdf")
 
     try:
+        # JPEGs that need no resizing or rotation go in as-is, without re-encoding
+        info = embeddable_jpeg(input_path) if ext in ('.jpg', '.jpeg') else None
+        if info is not None and (not max_size or max(info[:2]) <= max_size):
+            with open(input_path, "rb") as f:
+                data = f.read()
+            with PdfStreamWriter(output_path, dpi=100) as writer:
+                writer.add_jpeg(data, *info)
+            print(f"✅ PDF saved: {output_path}")
+            return
+
         if ext in RAW_FORMATS:
-            image = convert_raw_to_image(input_path)
+            image = convert_raw_to_image(input_path, max_size)
         else:
-            image = Image.open(input_path)
+            image = ImageOps.exif_transpose(open_image(input_path))
 
         if image is None:
             print(f"❌ Skipping: {input_path}")
@@ -48,6 +60,8 @@ def convert_image_to_pdf(input_path):
 
         if image.mode in ("RGBA", "P"):
             image = image.convert("RGB")
+        if max_size:
+            image.thumbnail((max_size, max_size), Image.LANCZOS)
 
         image.save(output_path, "PDF", resolution=100.0)
         print(f"✅ PDF saved: {output_path}")
@@ -56,24 +70,26 @@ def convert_image_to_pdf(input_path):
     except Exception as e:
         print(f"❌ Error converting {input_path}: {e}")
 
-def convert_folder(folder_path, include_subfolders=False):
+def convert_folder(folder_path, include_subfolders=False, max_size=None):
     for root, _, files in os.walk(folder_path):
         for file in files:
             if file.lower().endswith(ALL_FORMATS):
-                convert_image_to_pdf(os.path.join(root, file))
+                convert_image_to_pdf(os.path.join(root, file), max_size)
         if not include_subfolders:
             break
 
 # === Main ===
 if __name__ == "__main__":
     path = input("📂 Enter image file or folder path: ").strip().strip('"')
+    size_input = input("📏 Max longest side in pixels (Enter for full size): ").strip()
+    max_size = int(size_input) if size_input.isdigit() else None
 
     if os.path.isfile(path):
-        convert_image_to_pdf(path)
+        convert_image_to_pdf(path, max_size)
 
     elif os.path.isdir(path):
         subfolders = input("🔁 Include subfolders? (y/n): ").strip().lower() == 'y'
-        convert_folder(path, include_subfolders=subfolders)
+        convert_folder(path, include_subfolders=subfolders, max_size=max_size)
 
     else:
         print("❌ Invalid path. Please enter a valid image file or folder.")
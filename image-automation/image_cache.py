@@ -0,0 +1,92 @@
+import os
+import hashlib
+
+import numpy as np
+from PIL import Image, ImageOps
+
+CACHE_DIR = os.path.expanduser("~/.cache/python-automation/decoded-images")
+MAX_CACHE_BYTES = 8 * 1024 * 1024 * 1024
+# Formats slow enough to decode that reading back a cached buffer wins
+CACHED_FORMATS = ('.heic', '.heif', '.avif')
+CHUNK_SIZE = 8 * 1024 * 1024
+
+def content_key(path, params):
+    """Hash of the file's bytes plus the decode parameters, so edits or other settings never hit stale entries."""
+    digest = hashlib.blake2b(repr(params).encode("utf-8"), digest_size=20)
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _evict(cache_dir, max_bytes):
+    """Deletes least recently used entries (oldest mtime, bumped on every hit) until under `max_bytes`."""
+    entries = []
+    total = 0
+    for shard in os.listdir(cache_dir):
+        shard_path = os.path.join(cache_dir, shard)
+        if not os.path.isdir(shard_path):
+            continue
+        with os.scandir(shard_path) as it:
+            for entry in it:
+                if not entry.name.endswith(".npy"):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+def cached_decode(path, params, decode, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    """
+    Returns a PIL image for `path`, read from the shared cache when it holds
+    the same content decoded with the same `params`, else produced by
+    decode() and stored as a plain .npy file (memory-mapped on later reads).
+    """
+    if not max_bytes:
+        return decode()
+    try:
+        key = content_key(path, params)
+    except OSError:
+        return decode()
+    cache_path = os.path.join(cache_dir, key[:2], f"{key}.npy")
+
+    try:
+        pixels = np.load(cache_path, mmap_mode="r")
+        os.utime(cache_path)
+        return Image.fromarray(pixels)
+    except (OSError, ValueError):
+        pass
+
+    img = decode()
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        # Several processes may decode the same file; the last rename wins
+        temp_path = f"{cache_path}.{os.getpid()}.part"
+        with open(temp_path, "wb") as file:
+            np.save(file, np.asarray(img))
+        os.replace(temp_path, cache_path)
+        _evict(cache_dir, max_bytes)
+    except OSError as e:
+        print(f"⚠️ Could not cache decoded '{path}': {e}")
+    return img
+
+def open_image(path):
+    """Image.open for most formats; slow ones go through the cache, already EXIF-rotated."""
+    if not path.lower().endswith(CACHED_FORMATS):
+        return Image.open(path)
+
+    def decode():
+        with Image.open(path) as img:
+            return ImageOps.exif_transpose(img).convert("RGB")
+    return cached_decode(path, ("pil",), decode)
@@ -1,21 +1,26 @@
 import os
 import sys
+import queue
+import threading
 import subprocess
 
 # 📦 Auto-install dependencies
 try:
-    from PIL import Image, UnidentifiedImageError
+    from PIL import Image, ImageOps, UnidentifiedImageError
 except ImportError:
     subprocess.check_call([sys.executable, "-m", "pip", "install", "pillow"])
-    from PIL import Image, UnidentifiedImageError
+    from PIL import Image, ImageOps, UnidentifiedImageError
 
+# Only checked here: raw_decode needs rawpy (which brings numpy for image_cache),
+# so it has to be installed before those helpers are imported
 try:
     import rawpy
-    import imageio
 except ImportError:
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "rawpy", "imageio"])
-    import rawpy
-    import imageio
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "rawpy"])
+
+from raw_decode import decode_raw
+from image_cache import open_image
+from pdf_stream import PdfStreamWriter, embeddable_jpeg, encode_jpeg
 
 # Supported formats
 COMMON_FORMATS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp', '.tiff', '.gif', '.heic', '.avif')
@@ -25,11 +30,9 @@ ALL_FORMATS = COMMON_FORMATS + RAW_FORMATS
 # Resize target (A4 in pixels at 100 DPI)
 A4_SIZE = (1240, 1754)
 
-def convert_raw_to_image(path):
+def convert_raw_to_image(path, min_size=None, strategy="auto"):
     try:
-        with rawpy.imread(path) as raw:
-            rgb = raw.postprocess()
-            return Image.fromarray(rgb)
+        return decode_raw(path, min_size, strategy)
     except Exception as e:
         print(f"❌ RAW error: {path} — {e}")
         return None
@@ -38,9 +41,10 @@ def load_image(path, resize=False):
     ext = os.path.splitext(path)[1].lower()
     try:
         if ext in RAW_FORMATS:
-            img = convert_raw_to_image(path)
+            # A4 pages rarely need the full sensor resolution
+            img = convert_raw_to_image(path, A4_SIZE if resize else None)
         else:
-            img = Image.open(path)
+            img = ImageOps.exif_transpose(open_image(path))
         if img is None:
             return None
         if img.mode in ("RGBA", "P"):
@@ -52,31 +56,84 @@ def load_image(path, resize=False):
         print(f"❌ Failed to load {path}: {e}")
         return None
 
-def collect_images(path, recursive=False, resize=False):
-    images = []
+def collect_image_paths(path, recursive=False):
+    paths = []
     for root, _, files in os.walk(path):
         for f in sorted(files):
             if f.lower().endswith(ALL_FORMATS):
-                img = load_image(os.path.join(root, f), resize=resize)
-                if img:
-                    images.append(img)
+                paths.append(os.path.join(root, f))
         if not recursive:
             break
-    return images
+    return paths
+
+def _prefetch(iterable, depth):
+    """Runs `iterable` on a background thread, at most `depth` items ahead of the consumer."""
+    pages = queue.Queue(maxsize=max(1, depth))
+    done = object()
+
+    def produce():
+        try:
+            for item in iterable:
+                pages.put((item, None))
+        except BaseException as e:
+            # Hand the error to the consumer, a bare end marker would pass for a complete run
+            pages.put((done, e))
+        else:
+            pages.put((done, None))
+
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        item, error = pages.get()
+        if error is not None:
+            raise error
+        if item is done:
+            return
+        yield item
+
+def _passthrough(path, resize=False):
+    """Returns add_jpeg arguments using the file's own bytes, or None if it needs re-encoding."""
+    if not path.lower().endswith(('.jpg', '.jpeg')):
+        return None
+    try:
+        info = embeddable_jpeg(path)
+        if info is None or (resize and info[:2] != A4_SIZE):
+            return None
+        with open(path, "rb") as f:
+            return (f.read(), *info)
+    except (OSError, ValueError):
+        return None
+
+def create_pdf(images, output_path="merged_output.pdf", dpi=100, resize=False, prefetch=2):
+    """
+    Writes one page per image, streaming: each page is decoded, resized,
+    encoded and written before the next, with `prefetch` pages prepared
+    ahead on a background thread. `images` may be paths or PIL images.
+    JPEGs that need no resizing or rotation are embedded without re-encoding.
+    """
+    def pages():
+        for image in images:
+            try:
+                page = _passthrough(image, resize) if isinstance(image, str) else None
+                if page is None:
+                    img = load_image(image, resize=resize) if isinstance(image, str) else image
+                    page = encode_jpeg(img) if img is not None else None
+            except Exception as e:
+                # One bad image only costs its own page
+                print(f"❌ Skipping {image}: {e}")
+                continue
+            if page is not None:
+                yield page
 
-def create_pdf(images, output_path="merged_output.pdf", dpi=100):
-    if not images:
-        print("❌ No images to convert.")
-        return
     try:
-        images[0].save(
-            output_path,
-            "PDF",
-            resolution=dpi,
-            save_all=True,
-            append_images=images[1:]
-        )
+        with PdfStreamWriter(output_path, dpi=dpi) as writer:
+            for data, width, height, mode in _prefetch(pages(), prefetch):
+                writer.add_jpeg(data, width, height, mode)
+                print(f"📄 Page {len(writer)} added")
+            if not len(writer):
+                raise ValueError("No images to convert.")
         print(f"\n✅ PDF created: {output_path}")
+    except ValueError as e:
+        print(f"❌ {e}")
     except Exception as e:
         print(f"❌ Error saving PDF: {e}")
 
@@ -93,7 +150,7 @@ if __name__ == "__main__":
     output_path = os.path.join(path, f"{name}.pdf")
 
     if os.path.isdir(path):
-        imgs = collect_images(path, recursive=recursive, resize=resize)
-        create_pdf(imgs, output_path=output_path, dpi=dpi)
+        paths = collect_image_paths(path, recursive=recursive)
+        create_pdf(paths, output_path=output_path, dpi=dpi, resize=resize)
     else:
         print("❌ Invalid folder path.")
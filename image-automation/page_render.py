@@ -0,0 +1,74 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF
+
+def parse_page_range(spec, page_count):
+    """
+    Turns "1-3,7,10-" (1-based, open ends allowed) into sorted 0-based page
+    numbers. An empty spec means every page; pages past the end, or a spec
+    selecting nothing, raise ValueError.
+    """
+    if not spec or not spec.strip():
+        return list(range(page_count))
+    pages = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            first = int(start) if start.strip() else 1
+            last = int(end) if end.strip() else page_count
+        else:
+            first = last = int(part)
+        if max(first, last) > page_count:
+            raise ValueError(f"Page range '{part}' goes past the last page ({page_count})")
+        if first < 1 or last < first:
+            raise ValueError(f"Invalid page range '{part}'")
+        pages.update(range(first - 1, last))
+    if not pages:
+        raise ValueError(f"Page range '{spec}' selects no pages")
+    return sorted(pages)
+
+def _render_chunk(pdf_path, pages, zoom, quality):
+    # Each worker opens its own document; fitz objects can't cross processes
+    doc = fitz.open(pdf_path)
+    matrix = fitz.Matrix(zoom, zoom)
+    results = []
+    try:
+        for page_num in pages:
+            pix = doc.load_page(page_num).get_pixmap(matrix=matrix, alpha=False)
+            results.append((page_num, pix.tobytes("jpeg", jpg_quality=quality), pix.width, pix.height))
+    finally:
+        doc.close()
+    return results
+
+def render_pages(pdf_path, pages=None, zoom=1.0, quality=80, workers=None, chunk_size=None):
+    """
+    Renders `pages` (0-based, default all) to JPEG across a process pool and
+    yields (page_num, jpeg_bytes, width, height) in page order. Pages go out
+    in contiguous chunks and only a few chunks per worker are in flight, so
+    results can be streamed straight into the output.
+    """
+    if pages is None:
+        with fitz.open(pdf_path) as doc:
+            pages = list(range(len(doc)))
+    if not pages:
+        return
+    workers = workers or os.cpu_count() or 1
+    chunk_size = chunk_size or max(1, min(16, len(pages) // (workers * 4)))
+    chunks = deque(pages[i:i + chunk_size] for i in range(0, len(pages), chunk_size))
+
+    if workers == 1 or len(chunks) == 1:
+        while chunks:
+            yield from _render_chunk(pdf_path, chunks.popleft(), zoom, quality)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        while chunks or in_flight:
+            while chunks and len(in_flight) < workers * 2:
+                in_flight.append(executor.submit(_render_chunk, pdf_path, chunks.popleft(), zoom, quality))
+            yield from in_flight.popleft().result()
@@ -2,7 +2,7 @@ import os
 import sys
 import subprocess
 
-# 📦 Auto-install PyMuPDF and Pillow if missing
+# 📦 Auto-install PyMuPDF if missing
 def install(package):
     subprocess.check_call([sys.executable, "-m", "pip", "install", package])
 
@@ -13,14 +13,10 @@ except ImportError:
     install("pymupdf")
     import fitz
 
-try:
-    from PIL import Image
-except ImportError:
-    print("📦 Installing Pillow...")
-    install("pillow")
-    from PIL import Image
+from page_render import parse_page_range, render_pages
 
-def convert_pdf_to_jpeg_native(pdf_path, zoom=2.0, quality=95):
+def convert_pdf_to_jpeg_native(pdf_path, zoom=2.0, quality=95, page_range=None, workers=None):
+    """Renders pages (all, or e.g. "1-3,7") to JPEGs next to the PDF, on all cores."""
     if not os.path.isfile(pdf_path):
         print(f"❌ File not found: {pdf_path}")
         return
@@ -29,21 +25,25 @@ def convert_pdf_to_jpeg_native(pdf_path, zoom=2.0, quality=95):
     base_name = os.path.splitext(os.path.basename(pdf_path))[0]
 
     print(f"📄 Opening: {pdf_path}")
-    doc = fitz.open(pdf_path)
-    total_pages = len(doc)
+    with fitz.open(pdf_path) as doc:
+        total_pages = len(doc)
 
-    for page_num in range(total_pages):
-        page = doc.load_page(page_num)
-        mat = fitz.Matrix(zoom, zoom)  # 2.0 = ~300 DPI
-        pix = page.get_pixmap(matrix=mat)
+    try:
+        pages = parse_page_range(page_range, total_pages)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
 
+    # 2.0 zoom = ~144 DPI
+    for page_num, data, _, _ in render_pages(pdf_path, pages, zoom=zoom, quality=quality, workers=workers):
         output_file = os.path.join(output_folder, f"{base_name}_page_{page_num+1}.jpg")
-        pix.save(output_file, "jpeg")
+        with open(output_file, "wb") as f:
+            f.write(data)
         print(f"✅ Saved: {output_file}")
 
-    print(f"✅ Finished converting {total_pages} pages.")
-    doc.close()
+    print(f"✅ Finished converting {len(pages)} of {total_pages} pages.")
 
 if __name__ == "__main__":
     input_path = input("📥 Enter full path to PDF file: ").strip().strip('"')
-    convert_pdf_to_jpeg_native(input_path)
+    page_range = input("📑 Pages to convert (e.g. 1-3,7; Enter for all): ").strip()
+    convert_pdf_to_jpeg_native(input_path, page_range=page_range)
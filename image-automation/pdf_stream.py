@@ -0,0 +1,180 @@
+import io
+import os
+import struct
+
+COLOR_SPACES = {"RGB": "/DeviceRGB", "L": "/DeviceGray"}
+JPEG_MODES = {1: "L", 3: "RGB"}
+# Baseline, extended and progressive Huffman frames; PDF readers decode all three
+EMBEDDABLE_SOF = (0xC0, 0xC1, 0xC2)
+OTHER_SOF = (0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF)
+ORIENTATION_TAG = 0x0112
+
+def _exif_orientation(payload):
+    tiff = payload[6:]
+    endian = "<" if tiff[:2] == b"II" else ">"
+    try:
+        (ifd,) = struct.unpack_from(endian + "I", tiff, 4)
+        (count,) = struct.unpack_from(endian + "H", tiff, ifd)
+        for i in range(count):
+            tag, _, _, value = struct.unpack_from(endian + "HHIH", tiff, ifd + 2 + 12 * i)
+            if tag == ORIENTATION_TAG:
+                return value
+    except struct.error:
+        pass
+    return 1
+
+def embeddable_jpeg(path):
+    """
+    Reads only the JPEG header. Returns (width, height, mode) when the file can
+    go into a PDF verbatim as a DCTDecode stream (8-bit, gray or RGB, no EXIF
+    rotation), otherwise None.
+    """
+    orientation = 1
+    with open(path, "rb") as file:
+        if file.read(2) != b"\xff\xd8":
+            return None
+        while True:
+            marker = file.read(2)
+            if len(marker) < 2 or marker[0] != 0xFF:
+                return None
+            code = marker[1]
+            if code == 0xFF:
+                # Fill byte, the marker code follows
+                file.seek(-1, os.SEEK_CUR)
+                continue
+            # A truncated or malformed header just means "re-encode it"
+            header = file.read(2)
+            if len(header) < 2:
+                return None
+            (length,) = struct.unpack(">H", header)
+            if length < 2:
+                return None
+            if code == 0xE1:
+                payload = file.read(length - 2)
+                if payload.startswith(b"Exif\0\0"):
+                    orientation = _exif_orientation(payload)
+            elif code in EMBEDDABLE_SOF:
+                frame = file.read(6)
+                if len(frame) < 6:
+                    return None
+                precision, height, width, components = struct.unpack(">BHHB", frame)
+                if precision != 8 or components not in JPEG_MODES or orientation != 1 or not width or not height:
+                    return None
+                # A file cut short after the header would embed a broken image
+                file.seek(-2, os.SEEK_END)
+                if file.read(2) != b"\xff\xd9":
+                    return None
+                return width, height, JPEG_MODES[components]
+            elif code in OTHER_SOF or code == 0xDA:
+                return None
+            else:
+                file.seek(length - 2, os.SEEK_CUR)
+
+def encode_jpeg(img, quality=95):
+    """Returns (jpeg_bytes, width, height, mode), the arguments of PdfStreamWriter.add_jpeg."""
+    if img.mode not in COLOR_SPACES:
+        img = img.convert("RGB")
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue(), img.width, img.height, img.mode
+
+def _info_dict(entries):
+    """PDF Info dictionary from {"Title": "...", ...}, values as UTF-16 text strings."""
+    parts = []
+    for key, value in entries.items():
+        text = ("\ufeff" + str(value)).encode("utf-16-be").hex()
+        parts.append(f"/{key} <{text}>")
+    return f"<< {' '.join(parts)} >>".encode("ascii")
+
+class PdfStreamWriter:
+    """
+    Writes a PDF of full-page JPEG images one page at a time, so memory stays
+    flat however many pages there are. Objects 1 and 2 (catalog and page tree)
+    are reserved up front and written by close(), once every page is known.
+    Page sizes follow the image size at `dpi`, like Pillow's PDF writer.
+    `info` holds optional document metadata such as {"Title": ...}.
+    """
+
+    def __init__(self, path, dpi=100, info=None):
+        self.path = path
+        self.dpi = dpi
+        self.info = info or {}
+        self.temp_path = path + ".part"
+        self.file = open(self.temp_path, "wb")
+        self.offsets = {}
+        self.pages = []
+        self.next_id = 3
+        self.file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def __len__(self):
+        return len(self.pages)
+
+    def _object(self, body, stream=None, obj_id=None):
+        if obj_id is None:
+            obj_id = self.next_id
+            self.next_id += 1
+        self.offsets[obj_id] = self.file.tell()
+        self.file.write(f"{obj_id} 0 obj\n".encode("ascii") + body)
+        if stream is not None:
+            self.file.write(b"\nstream\n")
+            self.file.write(stream)
+            self.file.write(b"\nendstream")
+        self.file.write(b"\nendobj\n")
+        return obj_id
+
+    def add_jpeg(self, data, width, height, mode="RGB"):
+        """Adds a page showing `data`, JPEG bytes embedded as-is (DCTDecode)."""
+        image_id = self._object(
+            f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace {COLOR_SPACES[mode]} /BitsPerComponent 8 /Filter /DCTDecode "
+            f"/Length {len(data)} >>".encode("ascii"),
+            data,
+        )
+        page_width = width * 72.0 / self.dpi
+        page_height = height * 72.0 / self.dpi
+        content = f"q {page_width:.4f} 0 0 {page_height:.4f} 0 0 cm /Im0 Do Q".encode("ascii")
+        content_id = self._object(f"<< /Length {len(content)} >>".encode("ascii"), content)
+        page_id = self._object(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {page_width:.4f} {page_height:.4f}] "
+            f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> /Contents {content_id} 0 R >>".encode("ascii")
+        )
+        self.pages.append(page_id)
+
+    def add_image(self, img, quality=95):
+        """Encodes a PIL image to JPEG and adds it as a page."""
+        self.add_jpeg(*encode_jpeg(img, quality))
+
+    def close(self):
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.pages)
+        self._object(b"<< /Type /Catalog /Pages 2 0 R >>", obj_id=1)
+        self._object(f"<< /Type /Pages /Kids [{kids}] /Count {len(self.pages)} >>".encode("ascii"), obj_id=2)
+
+        info_ref = ""
+        entries = {key: value for key, value in self.info.items() if value}
+        if entries:
+            info_ref = f" /Info {self._object(_info_dict(entries))} 0 R"
+
+        xref_offset = self.file.tell()
+        count = self.next_id
+        lines = [f"xref\n0 {count}\n", "0000000000 65535 f \n"]
+        lines.extend(f"{self.offsets[obj_id]:010d} 00000 n \n" for obj_id in range(1, count))
+        lines.append(f"trailer\n<< /Size {count} /Root 1 0 R{info_ref} >>\nstartxref\n{xref_offset}\n%%EOF\n")
+        self.file.write("".join(lines).encode("ascii"))
+        self.file.close()
+        os.replace(self.temp_path, self.path)
+
+    def abort(self):
+        self.file.close()
+        try:
+            os.remove(self.temp_path)
+        except OSError:
+            pass
@@ -0,0 +1,66 @@
+import io
+
+import rawpy
+from PIL import Image, ImageOps
+
+from image_cache import cached_decode
+
+STRATEGIES = ("auto", "thumb", "half", "full")
+
+# LibRaw's flip codes for the embedded preview, which is stored unrotated
+FLIP_TRANSPOSE = {3: Image.Transpose.ROTATE_180, 5: Image.Transpose.ROTATE_90, 6: Image.Transpose.ROTATE_270}
+
+def covers(size, min_size):
+    """True if `size` is at least `min_size` in either orientation. (n, 0) only asks for a long side of n."""
+    if min_size is None:
+        return False
+    return all(have >= need for have, need in zip(sorted(size), sorted(min_size)))
+
+def _embedded_preview(raw):
+    try:
+        thumb = raw.extract_thumb()
+    except Exception:
+        return None
+    if thumb.format == rawpy.ThumbFormat.JPEG:
+        img = Image.open(io.BytesIO(thumb.data))
+        if img.getexif().get(0x0112):
+            return ImageOps.exif_transpose(img).convert("RGB")
+        img = img.convert("RGB")
+    elif thumb.format == rawpy.ThumbFormat.BITMAP:
+        img = Image.fromarray(thumb.data)
+    else:
+        return None
+    transpose = FLIP_TRANSPOSE.get(raw.sizes.flip)
+    return img.transpose(transpose) if transpose is not None else img
+
+def _output_size(raw, half=False):
+    width, height = raw.sizes.width, raw.sizes.height
+    if half:
+        width, height = width // 2, height // 2
+    return (height, width) if raw.sizes.flip in (5, 6) else (width, height)
+
+def _half_size(raw, min_size, strategy):
+    """True when half-size demosaicing is enough for `min_size` (or forced by `strategy`)."""
+    return strategy == "half" or (strategy == "auto" and covers(_output_size(raw, half=True), min_size))
+
+def decode_raw(path, min_size=None, strategy="auto"):
+    """
+    Decodes a RAW file to an RGB PIL image, as cheaply as `min_size` allows:
+    the embedded JPEG preview if it is big enough, then half-size
+    demosaicing, then a full decode. "thumb", "half" and "full" force a level
+    ("thumb" still falls back when the file has no usable preview).
+    Demosaiced results are shared through the decoded-image cache, keyed on
+    the postprocess parameters actually used, so callers asking for
+    different sizes still hit the same entry; previews are cheap and not cached.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown RAW strategy '{strategy}', expected one of: {', '.join(STRATEGIES)}")
+    with rawpy.imread(path) as raw:
+        if strategy in ("auto", "thumb") and (strategy == "thumb" or min_size is not None):
+            preview = _embedded_preview(raw)
+            if preview is not None and (strategy == "thumb" or covers(preview.size, min_size)):
+                return preview
+
+        params = {"half_size": _half_size(raw, min_size, strategy)}
+        # rawpy only unpacks the sensor data on postprocess, so a cache hit skips it
+        return cached_decode(path, ("raw", sorted(params.items())), lambda: Image.fromarray(raw.postprocess(**params)))